@@ -47,9 +47,11 @@ async def register(user: UserCreate):
 
     # Send verification email (non-blocking failure)
     try:
-        await email_service.send_verification_email(user.email, user.full_name)
+        queued = await email_service.send_verification_email(user.email, user.full_name)
     except Exception as e:
         logger.warning(f"Email sending failed for {user.email}: {e}")
+        queued = False
+    if not queued:
         return {
             "message": "User created. Email verification failed - please contact support.",
             "user_id": result.data[0]["id"]
@@ -205,7 +207,11 @@ async def resend_verification(email_request: ForgotPassword):
             detail="Email is already verified"
         )
 
-    await email_service.send_verification_email(email_request.email, user_data.get("full_name"))
+    if not await email_service.send_verification_email(email_request.email, user_data.get("full_name")):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to send verification email"
+        )
     return {"message": "Verification email sent successfully"}
 
 
@@ -1,15 +1,31 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, status
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List
+from typing import AsyncIterator, List
+import hashlib
 import uuid
+import orjson
 from app.models.schemas import Document, DocumentUpload
 from app.core.security import verify_token
-from app.services.supabase_client import supabase_client, storage_client
-from app.services.document_processor import doc_processor
+from app.services.supabase_client import supabase_client
+from app.repositories.supabase_document import (
+    RESUMABLE_THRESHOLD,
+    SupabaseDocumentRepository,
+    get_supabase_document_repository,
+)
+from app.services.document_processor import get_document_processor
 
 router = APIRouter()
 security = HTTPBearer()
 
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+async def iter_upload_file(file: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield the contents of an uploaded file in fixed-size chunks."""
+    await file.seek(0)
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
 async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)):
     payload = verify_token(credentials.credentials)
     user_id = payload.get("sub")
@@ -23,7 +39,8 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
 @router.post("/upload", response_model=dict)
 async def upload_document(
     file: UploadFile = File(...),
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    storage_client: SupabaseDocumentRepository = Depends(get_supabase_document_repository)
 ):
     try:
         # Validate file type
@@ -38,15 +55,21 @@ async def upload_document(
         file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
         unique_filename = f"{user_id}/{uuid.uuid4()}.{file_extension}"
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Upload to Supabase storage
-        public_url = await storage_client.upload_document(
-            file_content=file_content,
-            file_path=unique_filename,
-            content_type=file.content_type
-        )
+        if file.size is not None and file.size > RESUMABLE_THRESHOLD:
+            # Large files go through the resumable endpoint so a dropped
+            # connection only costs the current chunk
+            public_url = await storage_client.upload_document_resumable(
+                file_content=file.file,
+                file_path=unique_filename,
+                content_type=file.content_type
+            )
+        else:
+            # Stream to Supabase storage without buffering the whole file
+            public_url = await storage_client.upload_document(
+                file_content=iter_upload_file(file),
+                file_path=unique_filename,
+                content_type=file.content_type
+            )
         
         if not public_url:
             raise HTTPException(
@@ -67,8 +90,8 @@ async def upload_document(
         result = supabase_client.table("documents").insert(document_data).execute()
         document_id = result.data[0]["id"]
         
-        # Process document asynchronously
-        await doc_processor.process_document(document_id, file_content, file.content_type)
+        # Process straight from the spooled upload rather than a bytes copy
+        await get_document_processor().process_document(document_id, file.file, file.content_type)
         
         return {
             "message": "Document uploaded successfully",
@@ -86,9 +109,22 @@ async def upload_document(
         )
 
 @router.get("/", response_model=List[Document])
-async def get_user_documents(user_id: str = Depends(get_current_user_id)):
+async def get_user_documents(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user_id)
+):
     try:
         documents = supabase_client.table("documents").select("*").eq("user_id", user_id).execute()
+
+        # Per-user list: browsers may cache it for 30s, shared caches may not;
+        # the ETag lets clients revalidate with a body-less 304
+        etag = '"' + hashlib.sha1(orjson.dumps(documents.data, default=str)).hexdigest() + '"'
+        cache_headers = {"Cache-Control": "private, max-age=30", "ETag": etag}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+        response.headers.update(cache_headers)
         return documents.data
     
     except Exception as e:
@@ -100,7 +136,8 @@ async def get_user_documents(user_id: str = Depends(get_current_user_id)):
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: str,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    storage_client: SupabaseDocumentRepository = Depends(get_supabase_document_repository)
 ):
     try:
         # Get document to verify ownership
@@ -136,6 +136,10 @@ class BaseConfig(BaseSettings):
         default="documents",
         description="Supabase storage bucket name for documents"
     )
+    storage_list_ttl_seconds: int = Field(
+        default=30,
+        description="TTL in seconds for cached storage directory listings"
+    )
     
     # ============================================================================
     # EMBEDDING CONFIGURATION
@@ -188,6 +192,14 @@ class BaseConfig(BaseSettings):
         default="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         description="Bedrock model identifier"
     )
+    bedrock_max_pool: int = Field(
+        default=50,
+        description="Max pooled HTTP connections per Bedrock client (BEDROCK_MAX_POOL)"
+    )
+    bedrock_validate_model: bool = Field(
+        default=False,
+        description="Check the model against the Bedrock model list when an LLM is built"
+    )
     
     # ============================================================================
     # EMAIL CONFIGURATION
@@ -224,6 +236,18 @@ class BaseConfig(BaseSettings):
         default=False,
         description="Use SSL/TLS for SMTP"
     )
+    email_workers: int = Field(
+        default=8,
+        description="Number of background workers sending queued emails"
+    )
+    smtp_pool_size: int = Field(
+        default=4,
+        description="Maximum number of persistent SMTP connections"
+    )
+    smtp_pool_recycle: int = Field(
+        default=1800,
+        description="Seconds after which a pooled SMTP connection is reopened"
+    )
     
     # ============================================================================
     # GOOGLE OAUTH CONFIGURATION
@@ -378,6 +402,16 @@ class BaseConfig(BaseSettings):
         description="Include source attribution in responses"
     )
 
+    # Document ingestion settings
+    document_chunk_batch_size: int = Field(
+        default=32,
+        description="Number of chunks embedded and stored per ingestion batch"
+    )
+    document_processing_concurrency: int = Field(
+        default=8,
+        description="Maximum concurrent ingestion batches (keep below the DB pool size)"
+    )
+
     # Resilience settings
     rag_max_retries: int = Field(
         default=3,
@@ -1,6 +1,7 @@
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 import time
 import uuid
 from typing import Callable
@@ -123,4 +124,38 @@ class CORSLoggingMiddleware(BaseHTTPMiddleware):
             )
         
         response = await call_next(request)
-        return response
\ No newline at end of file
+        return response
+
+
+class StreamAwareGZipMiddleware:
+    """
+    GZip responses, except Server-Sent Event streams.
+
+    GZip buffers output until its compressor emits a block, which would hold
+    back SSE tokens; streaming paths and ``Accept: text/event-stream``
+    requests bypass compression.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        exclude_paths: tuple = ("/api/chat/stream",),
+    ):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not self._is_event_stream(scope):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    def _is_event_stream(self, scope: Scope) -> bool:
+        if scope["path"].startswith(self.exclude_paths):
+            return True
+        for name, value in scope["headers"]:
+            if name == b"accept" and b"text/event-stream" in value:
+                return True
+        return False
@@ -2,7 +2,8 @@
 Database CRUD operations with a Supabase-like interface.
 This module provides a compatibility layer that mimics the Supabase client API.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import uuid
 from app.database.connection import SessionLocal
@@ -153,37 +154,47 @@ class QueryBuilder:
 
 
 class InsertQueryBuilder(QueryBuilder):
-    """Query builder for insert operations"""
+    """Query builder for insert operations (single row or a list of rows)"""
 
-    def __init__(self, model_class, insert_data: Dict[str, Any]):
+    def __init__(self, model_class, insert_data: Union[Dict[str, Any], List[Dict[str, Any]]]):
         super().__init__(model_class)
         self._insert_data = insert_data
 
-    def execute(self) -> QueryResult:
-        session = self._get_session()
-        try:
-            data = self._insert_data.copy()
+    def _prepare_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        data = row.copy()
+
+        # Handle UUID fields
+        for key in ['id', 'user_id', 'document_id']:
+            if key in data:
+                data[key] = self._convert_uuid(data[key])
+
+        # Handle document_ids array - convert list of strings to list of UUIDs
+        if 'document_ids' in data and data['document_ids']:
+            data['document_ids'] = [self._convert_uuid(doc_id) for doc_id in data['document_ids']]
 
-            # Handle UUID fields
-            for key in ['id', 'user_id', 'document_id']:
-                if key in data:
-                    data[key] = self._convert_uuid(data[key])
+        # Handle reserved field name mappings
+        if self.model_class.__tablename__ == 'document_embeddings' and 'metadata' in data:
+            data['chunk_metadata'] = data.pop('metadata')
+        if self.model_class.__tablename__ == 'chat_history' and 'model_config' in data:
+            data['model_config_str'] = data.pop('model_config')
 
-            # Handle document_ids array - convert list of strings to list of UUIDs
-            if 'document_ids' in data and data['document_ids']:
-                data['document_ids'] = [self._convert_uuid(doc_id) for doc_id in data['document_ids']]
+        return data
 
-            # Handle reserved field name mappings
-            if self.model_class.__tablename__ == 'document_embeddings' and 'metadata' in data:
-                data['chunk_metadata'] = data.pop('metadata')
-            if self.model_class.__tablename__ == 'chat_history' and 'model_config' in data:
-                data['model_config_str'] = data.pop('model_config')
+    def execute(self) -> QueryResult:
+        rows = self._insert_data if isinstance(self._insert_data, list) else [self._insert_data]
+        if not rows:
+            return QueryResult([])
 
-            obj = self.model_class(**data)
-            session.add(obj)
+        session = self._get_session()
+        try:
+            # All rows go in one flush and one commit; serialize after the
+            # flush so reading the rows back doesn't cost a query per row
+            objs = [self.model_class(**self._prepare_row(row)) for row in rows]
+            session.add_all(objs)
+            session.flush()
+            inserted = [obj.to_dict() for obj in objs]
             session.commit()
-            session.refresh(obj)
-            return QueryResult([obj.to_dict()])
+            return QueryResult(inserted)
         except Exception as e:
             session.rollback()
             raise e
@@ -202,6 +213,36 @@ class UpdateQueryBuilder(QueryBuilder):
         return self.update(self._update_data)
 
 
+class BulkUpdateQueryBuilder(QueryBuilder):
+    """Query builder for updating many rows, each by primary key, in one transaction"""
+
+    def __init__(self, model_class, rows: List[Dict[str, Any]]):
+        super().__init__(model_class)
+        self._rows = rows
+
+    def execute(self) -> QueryResult:
+        if not self._rows:
+            return QueryResult([])
+
+        session = self._get_session()
+        try:
+            mappings = []
+            for row in self._rows:
+                data = row.copy()
+                data['id'] = self._convert_uuid(data['id'])
+                mappings.append(data)
+
+            # Rows sharing the same set of columns are sent as one executemany
+            session.bulk_update_mappings(self.model_class, mappings)
+            session.commit()
+            return QueryResult(self._rows)
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+
 class DeleteQueryBuilder(QueryBuilder):
     """Query builder for delete operations"""
 
@@ -209,6 +250,33 @@ class DeleteQueryBuilder(QueryBuilder):
         return self.delete()
 
 
+class RpcQueryBuilder:
+    """Mimics Supabase rpc() calls to PostgreSQL functions"""
+
+    def __init__(self, function_name: str, params: Optional[Dict[str, Any]] = None):
+        if not function_name.isidentifier():
+            raise ValueError(f"Invalid function name: {function_name}")
+        self.function_name = function_name
+        self._params = params or {}
+
+    def execute(self) -> QueryResult:
+        session = SessionLocal()
+        try:
+            # Named notation so argument order doesn't matter
+            args = ", ".join(f"{name} => :{name}" for name in self._params)
+            rows = session.execute(
+                text(f"SELECT * FROM {self.function_name}({args})"),
+                self._params
+            ).mappings().all()
+            session.commit()
+            return QueryResult([dict(row) for row in rows])
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+
 class TableProxy:
     """Proxy class for table operations"""
 
@@ -218,7 +286,7 @@ class TableProxy:
     def select(self, columns: str = "*") -> QueryBuilder:
         return QueryBuilder(self.model_class).select(columns)
 
-    def insert(self, data: Dict[str, Any]) -> InsertQueryBuilder:
+    def insert(self, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> InsertQueryBuilder:
         return InsertQueryBuilder(self.model_class, data)
 
     def update(self, data: Dict[str, Any]) -> UpdateQueryBuilder:
@@ -227,6 +295,9 @@ class TableProxy:
     def delete(self) -> DeleteQueryBuilder:
         return DeleteQueryBuilder(self.model_class)
 
+    def bulk_update(self, rows: List[Dict[str, Any]]) -> BulkUpdateQueryBuilder:
+        return BulkUpdateQueryBuilder(self.model_class, rows)
+
 
 class DatabaseClient:
     """Main database client that mimics Supabase client interface"""
@@ -247,6 +318,9 @@ class DatabaseClient:
             raise ValueError(f"Unknown table: {name}")
         return TableProxy(model_class)
 
+    def rpc(self, function_name: str, params: Optional[Dict[str, Any]] = None) -> RpcQueryBuilder:
+        return RpcQueryBuilder(function_name, params)
+
 
 # Global database client instance
 db_client = DatabaseClient()
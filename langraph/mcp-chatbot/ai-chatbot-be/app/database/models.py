@@ -1,7 +1,7 @@
 from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, ForeignKey, JSON, Numeric, ARRAY
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 from datetime import datetime
 import uuid as uuid_lib
 from app.database.connection import Base
@@ -96,7 +96,7 @@ class DocumentEmbedding(Base):
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(768))  # 768 dimensions for sentence-transformers/all-mpnet-base-v2
+    embedding = Column(HALFVEC(768))  # 768-dim FP16 for sentence-transformers/all-mpnet-base-v2
     chunk_metadata = Column("metadata", JSON)  # Use different Python name to avoid conflict
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
@@ -109,7 +109,7 @@ class DocumentEmbedding(Base):
             "document_id": str(self.document_id),
             "chunk_index": self.chunk_index,
             "content": self.content,
-            "embedding": self.embedding.tolist() if self.embedding is not None else None,
+            "embedding": self.embedding.to_list() if self.embedding is not None else None,
             "metadata": self.chunk_metadata,  # Return as 'metadata' for compatibility
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
@@ -86,7 +86,7 @@ CREATE TABLE IF NOT EXISTS document_embeddings (
     content TEXT NOT NULL,
     content_preview VARCHAR(500),
     content_vector TSVECTOR,
-    embedding VECTOR(768) NOT NULL, -- 768D for all-mpnet-base-v2
+    embedding HALFVEC(768) NOT NULL, -- 768D FP16 for all-mpnet-base-v2
     
     -- Metadata
     metadata JSONB DEFAULT '{}',
@@ -116,8 +116,9 @@ CREATE TABLE IF NOT EXISTS chat_history (
     -- Document references
     document_ids UUID[] DEFAULT '{}',
     
-    -- Performance metrics
-    total_response_time_ms INTEGER NOT NULL,
+    -- Performance metrics (the app writes response_time in seconds)
+    response_time DECIMAL(5,3),
+    total_response_time_ms INTEGER GENERATED ALWAYS AS (CAST(response_time * 1000 AS INTEGER)) STORED,
     retrieval_time_ms INTEGER,
     generation_time_ms INTEGER,
     
@@ -276,13 +277,19 @@ CREATE TABLE IF NOT EXISTS system_health_logs (
     metadata JSONB DEFAULT '{}'
 );
 
+-- One-time data backfills applied by scripts/apply_full_schema.py
+CREATE TABLE IF NOT EXISTS migrations (
+    name VARCHAR(255) PRIMARY KEY,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- =============================================================================
 -- HNSW INDEXES FOR OPTIMAL VECTOR SEARCH
 -- =============================================================================
 
 -- HNSW index for cosine similarity (primary for text embeddings)
 CREATE INDEX IF NOT EXISTS idx_doc_embeddings_embedding_hnsw_cosine ON document_embeddings 
-    USING hnsw (embedding vector_cosine_ops)
+    USING hnsw (embedding halfvec_cosine_ops)
     WITH (m = 16, ef_construction = 64);
 
 -- HNSW for query cache
@@ -466,14 +473,14 @@ BEGIN
         de.document_id,
         de.chunk_index,
         de.content,
-        1 - (de.embedding <=> query_embedding) as score,
+        1 - (de.embedding <=> query_embedding::halfvec) as score,
         de.metadata
     FROM document_embeddings de
     JOIN documents d ON de.document_id = d.id
     WHERE d.user_id = user_id_param
       AND de.embedding IS NOT NULL
-      AND 1 - (de.embedding <=> query_embedding) >= score_threshold
-    ORDER BY de.embedding <=> query_embedding
+      AND 1 - (de.embedding <=> query_embedding::halfvec) >= score_threshold
+    ORDER BY de.embedding <=> query_embedding::halfvec
     LIMIT top_k;
 END;
 $$ LANGUAGE plpgsql;
@@ -487,6 +494,55 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Replace any pending OTP for an email/purpose in a single round trip
+CREATE OR REPLACE FUNCTION upsert_otp(
+    p_email VARCHAR,
+    p_otp VARCHAR,
+    p_purpose VARCHAR,
+    p_expires_at TIMESTAMP WITH TIME ZONE
+)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM otps WHERE email = p_email AND purpose = p_purpose;
+    INSERT INTO otps (email, otp, purpose, expires_at, used)
+    VALUES (p_email, p_otp, p_purpose, p_expires_at, FALSE);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bulk variant of upsert_otp: one call, one transaction for many recipients
+CREATE OR REPLACE FUNCTION upsert_otps_bulk(
+    p_emails VARCHAR[],
+    p_otps VARCHAR[],
+    p_purpose VARCHAR,
+    p_expires_at TIMESTAMP WITH TIME ZONE
+)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM otps WHERE email = ANY(p_emails) AND purpose = p_purpose;
+    INSERT INTO otps (email, otp, purpose, expires_at, used)
+    SELECT e, o, p_purpose, p_expires_at, FALSE
+    FROM unnest(p_emails, p_otps) AS t(e, o);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Atomically mark a valid, unexpired OTP as used; returns whether one matched
+CREATE OR REPLACE FUNCTION consume_otp(
+    p_email VARCHAR,
+    p_otp VARCHAR,
+    p_purpose VARCHAR
+)
+RETURNS BOOLEAN AS $$
+BEGIN
+    UPDATE otps SET used = TRUE
+    WHERE email = p_email
+      AND otp = p_otp
+      AND purpose = p_purpose
+      AND used = FALSE
+      AND expires_at > CURRENT_TIMESTAMP;
+    RETURN FOUND;
+END;
+$$ LANGUAGE plpgsql;
+
 -- =============================================================================
 -- VIEWS FOR ANALYTICS
 -- =============================================================================
@@ -609,7 +665,7 @@ ALTER TABLE query_cache SET (
 
 COMMENT ON TABLE document_embeddings IS 'Vector embeddings with HNSW indexing for fast similarity search';
 COMMENT ON INDEX idx_doc_embeddings_embedding_hnsw_cosine IS 'HNSW index for cosine similarity - optimal for text embeddings';
-COMMENT ON COLUMN document_embeddings.embedding IS '768-dimensional embedding using all-mpnet-base-v2 model';
+COMMENT ON COLUMN document_embeddings.embedding IS '768-dimensional FP16 (halfvec) embedding using all-mpnet-base-v2 model';
 COMMENT ON TABLE query_cache IS 'LRU cache for frequent queries to improve response time';
 COMMENT ON TABLE embedding_cache IS 'Cache for text embeddings to reduce API calls';
 COMMENT ON FUNCTION hnsw_similarity_search IS 'Optimized HNSW search with user filtering and score threshold';
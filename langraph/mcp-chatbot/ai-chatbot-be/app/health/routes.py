@@ -10,7 +10,7 @@ Enterprise Features:
 - Dependency health checks (database, Redis, LLM, vector store)
 """
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 from fastapi.responses import JSONResponse
 from typing import Dict, Any
 from datetime import datetime, timezone
@@ -257,13 +257,16 @@ async def startup_probe():
 
 
 @router.get("/health", status_code=status.HTTP_200_OK)
-async def health_check_detailed():
+async def health_check_detailed(response: Response):
     """
     Detailed health check endpoint.
     
     Returns comprehensive health information including all dependencies.
-    Use for monitoring and debugging.
+    Use for monitoring and debugging. Cacheable for 30s so dashboards
+    polling it don't re-run every dependency check.
     """
+    response.headers["Cache-Control"] = "public, max-age=30"
+
     # Run all health checks
     checks = {
         "database": await check_database(),
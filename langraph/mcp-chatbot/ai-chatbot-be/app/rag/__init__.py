@@ -11,8 +11,8 @@ Usage:
     response = await chain.invoke("What is the document about?")
 
     # Or create with custom LLM
-    from app.services.llm_factory import llm_factory
-    llm = llm_factory.create_llm()
+    from app.services.llm_factory import get_llm_factory
+    llm = get_llm_factory().create_llm()
     chain = create_rag_chain(llm=llm, user_id="user123")
 """
 
@@ -7,7 +7,7 @@ Uses LangChain document loaders for consistent handling.
 
 import io
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, BinaryIO, Union
 from pathlib import Path
 
 from langchain_core.documents import Document
@@ -30,6 +30,10 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Raw file content accepted by the in-memory loaders. Buffers and open binary
+# streams are consumed in place so large uploads aren't copied again.
+FileContent = Union[bytes, memoryview, BinaryIO]
+
 
 class DocumentLoaderService:
     """
@@ -60,7 +64,7 @@ class DocumentLoaderService:
 
     def load_from_bytes(
         self,
-        content: bytes,
+        content: FileContent,
         content_type: str,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
@@ -69,7 +73,7 @@ class DocumentLoaderService:
         Load document from bytes content.
 
         Args:
-            content: Raw file bytes
+            content: Raw file bytes, a memoryview, or a binary stream
             content_type: MIME type of the file
             filename: Original filename
             metadata: Additional metadata to attach
@@ -154,13 +158,13 @@ class DocumentLoaderService:
 
     def _load_pdf(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Load PDF from bytes."""
         documents = []
-        pdf_file = io.BytesIO(content)
+        pdf_file = self._as_stream(content)
 
         try:
             pdf_reader = PyPDF2.PdfReader(pdf_file)
@@ -199,18 +203,19 @@ class DocumentLoaderService:
 
     def _load_text(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Load plain text from bytes."""
         # Try different encodings
         encodings = ["utf-8", "latin-1", "cp1252", "ascii"]
+        data = self._as_buffer(content)
         text = None
 
         for encoding in encodings:
             try:
-                text = content.decode(encoding)
+                text = str(data, encoding)
                 break
             except UnicodeDecodeError:
                 continue
@@ -229,12 +234,12 @@ class DocumentLoaderService:
 
     def _load_docx(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Load Word document from bytes."""
-        doc_file = io.BytesIO(content)
+        doc_file = self._as_stream(content)
         doc = docx.Document(doc_file)
 
         # Extract text from paragraphs
@@ -264,13 +269,13 @@ class DocumentLoaderService:
 
     def _load_csv(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Load CSV from bytes - each row becomes a document."""
         documents = []
-        text = content.decode("utf-8")
+        text = str(self._as_buffer(content), "utf-8")
         reader = csv.DictReader(io.StringIO(text))
 
         for row_num, row in enumerate(reader):
@@ -294,12 +299,12 @@ class DocumentLoaderService:
 
     def _load_json(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Load JSON from bytes."""
-        data = json.loads(content.decode("utf-8"))
+        data = json.loads(str(self._as_buffer(content), "utf-8"))
 
         # Convert JSON to readable text
         if isinstance(data, list):
@@ -329,7 +334,7 @@ class DocumentLoaderService:
 
     def _load_html(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
@@ -355,7 +360,7 @@ class DocumentLoaderService:
                     if text:
                         self.text.append(text)
 
-        html_content = content.decode("utf-8")
+        html_content = str(self._as_buffer(content), "utf-8")
         extractor = HTMLTextExtractor()
         extractor.feed(html_content)
 
@@ -372,12 +377,12 @@ class DocumentLoaderService:
 
     def _load_markdown(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Load Markdown from bytes."""
-        text = content.decode("utf-8")
+        text = str(self._as_buffer(content), "utf-8")
 
         doc_metadata = {
             "source": filename,
@@ -390,13 +395,29 @@ class DocumentLoaderService:
 
     def _load_as_text(
         self,
-        content: bytes,
+        content: FileContent,
         filename: str,
         metadata: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Fallback: try to load as plain text."""
         return self._load_text(content, filename, metadata)
 
+    @staticmethod
+    def _as_stream(content: FileContent) -> BinaryIO:
+        """Return a seekable binary stream over content without copying streams."""
+        if hasattr(content, "read"):
+            content.seek(0)
+            return content
+        return io.BytesIO(content)
+
+    @staticmethod
+    def _as_buffer(content: FileContent) -> Union[bytes, memoryview]:
+        """Return content as a buffer suitable for decoding."""
+        if hasattr(content, "read"):
+            content.seek(0)
+            return content.read()
+        return content
+
     @staticmethod
     def is_supported(content_type: str) -> bool:
         """Check if content type is supported."""
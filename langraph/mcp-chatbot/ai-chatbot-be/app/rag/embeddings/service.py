@@ -88,6 +88,7 @@ class EmbeddingsService:
         use_cache: bool = True,
         normalize: bool = True,
         batch_size: int = 32,
+        encode_batch_size: int = 128,
     ):
         """
         Initialize embeddings service.
@@ -97,12 +98,14 @@ class EmbeddingsService:
             model_name: Specific model to use
             use_cache: Enable embedding caching
             normalize: Normalize embeddings for cosine similarity
-            batch_size: Batch size for processing
+            batch_size: Batch size for API providers (texts per request)
+            encode_batch_size: SentenceTransformer batch size for local models
         """
         self.provider = provider
         self.use_cache = use_cache
         self.normalize = normalize
         self.batch_size = batch_size
+        self.encode_batch_size = encode_batch_size
 
         # Initialize the embedding model
         self.embeddings = self._init_embeddings(provider, model_name)
@@ -130,7 +133,12 @@ class EmbeddingsService:
             return HuggingFaceEmbeddings(
                 model_name=model,
                 model_kwargs={"device": "cpu"},
-                encode_kwargs={"normalize_embeddings": self.normalize},
+                encode_kwargs={
+                    "normalize_embeddings": self.normalize,
+                    "batch_size": self.encode_batch_size,
+                    "convert_to_numpy": True,
+                },
+                show_progress=False,
             )
 
         elif provider == "openai":
@@ -248,10 +256,13 @@ class EmbeddingsService:
             texts_to_embed = texts
             text_indices = list(range(len(texts)))
 
-        # Embed uncached texts in batches
+        # Embed uncached texts in batches. Local models get every text in one
+        # encode() call and batch internally (encode_batch_size); API providers
+        # are chunked to keep request payloads within provider limits.
         if texts_to_embed:
-            for i in range(0, len(texts_to_embed), self.batch_size):
-                batch = texts_to_embed[i : i + self.batch_size]
+            step = len(texts_to_embed) if self.provider == "huggingface" else self.batch_size
+            for i in range(0, len(texts_to_embed), step):
+                batch = texts_to_embed[i : i + step]
                 batch_embeddings = self.embeddings.embed_documents(batch)
 
                 # Normalize if needed
@@ -271,6 +282,28 @@ class EmbeddingsService:
         embeddings.sort(key=lambda x: x[0])
         return [e[1] for e in embeddings]
 
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts into a float32 array of shape (len(texts), dimensions).
+
+        Bulk jobs such as re-embedding want an array, not lists. Local models
+        are encoded straight to NumPy with the service's encode settings,
+        skipping the per-float list round trip and the embedding cache.
+        """
+        if self.provider != "huggingface":
+            return np.asarray(self.embed_documents(texts), dtype=np.float32)
+
+        # langchain_huggingface keeps the SentenceTransformer in _client,
+        # the langchain_community fallback in client
+        model = getattr(self.embeddings, "_client", None) or self.embeddings.client
+        return model.encode(
+            texts,
+            batch_size=self.encode_batch_size,
+            normalize_embeddings=self.normalize,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
     def embed_document_objects(self, documents: List[Document]) -> List[Document]:
         """
         Embed documents and attach embeddings to metadata.
@@ -183,8 +183,8 @@ async def response_generation_node(state: RAGState) -> dict[str, Any]:
         }
 
     try:
-        from app.services.llm_factory import llm_factory
-        llm = llm_factory.create_llm()
+        from app.services.llm_factory import get_llm_factory
+        llm = get_llm_factory().create_llm()
 
         # Determine mode based on query analysis
         mode = "conversational"
@@ -261,8 +261,8 @@ async def stream_response_generation(
         return
 
     try:
-        from app.services.llm_factory import llm_factory
-        llm = llm_factory.create_llm()
+        from app.services.llm_factory import get_llm_factory
+        llm = get_llm_factory().create_llm()
 
         mode = "conversational"
         system_prompt = _get_system_prompt(mode).format(
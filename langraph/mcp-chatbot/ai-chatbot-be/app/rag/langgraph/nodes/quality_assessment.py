@@ -143,11 +143,11 @@ async def query_reformulation_node(state: RAGState) -> dict[str, Any]:
     query_analysis = state.get("query_analysis", {})
 
     try:
-        from app.services.llm_factory import llm_factory
+        from app.services.llm_factory import get_llm_factory
         from langchain_core.prompts import ChatPromptTemplate
         from langchain_core.output_parsers import StrOutputParser
 
-        llm = llm_factory.create_llm()
+        llm = get_llm_factory().create_llm()
 
         reformulate_prompt = ChatPromptTemplate.from_messages([
             ("system", """The initial document search did not return good results.
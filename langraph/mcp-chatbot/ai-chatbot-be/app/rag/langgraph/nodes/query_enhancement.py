@@ -90,8 +90,8 @@ async def query_enhancement_node(state: RAGState) -> dict[str, Any]:
 
     try:
         # Get LLM for rewriting
-        from app.services.llm_factory import llm_factory
-        llm = llm_factory.create_llm()
+        from app.services.llm_factory import get_llm_factory
+        llm = get_llm_factory().create_llm()
 
         # Rewrite query if there's chat history and it's a follow-up
         if chat_history and query_analysis.get("is_follow_up", False):
@@ -427,8 +427,8 @@ def create_rag_chain(
 
 def get_llm_provider() -> str:
     """Get the current LLM provider name."""
-    from app.services.llm_factory import llm_factory
-    return llm_factory.get_current_provider()
+    from app.services.llm_factory import get_llm_factory
+    return get_llm_factory().get_current_provider()
 
 
 # Export for backward compatibility
@@ -51,7 +51,9 @@ class VectorStoreService:
         self,
         documents: List[Document],
         document_id: str,
-        batch_size: int = 100
+        batch_size: int = 100,
+        start_index: int = 0,
+        session: Optional[Session] = None,
     ) -> int:
         """
         Add documents to vector store.
@@ -60,6 +62,10 @@ class VectorStoreService:
             documents: List of Document objects to add
             document_id: Parent document ID
             batch_size: Batch size for insertion
+            start_index: Chunk index of the first document (for partial batches)
+            session: Caller-owned session; rows are flushed into its current
+                transaction and the caller commits. Defaults to a new session
+                committed per batch.
 
         Returns:
             Number of documents added
@@ -71,7 +77,9 @@ class VectorStoreService:
         texts = [doc.page_content for doc in documents]
         embeddings = self.embeddings_service.embed_documents(texts)
 
-        session = SessionLocal()
+        owns_session = session is None
+        if owns_session:
+            session = SessionLocal()
         added_count = 0
 
         try:
@@ -80,7 +88,7 @@ class VectorStoreService:
                 batch_embeddings = embeddings[i:i + batch_size]
 
                 for j, (doc, embedding) in enumerate(zip(batch_docs, batch_embeddings)):
-                    chunk_index = i + j
+                    chunk_index = start_index + i + j
 
                     embedding_record = DocumentEmbedding(
                         document_id=document_id,
@@ -92,19 +100,24 @@ class VectorStoreService:
                     session.add(embedding_record)
                     added_count += 1
 
-                session.commit()
+                if owns_session:
+                    session.commit()
+                else:
+                    session.flush()
                 logger.debug(f"Added batch of {len(batch_docs)} embeddings")
 
             logger.info(f"Added {added_count} embeddings for document {document_id}")
             return added_count
 
         except Exception as e:
-            session.rollback()
+            if owns_session:
+                session.rollback()
             logger.error(f"Error adding documents: {str(e)}")
             raise
 
         finally:
-            session.close()
+            if owns_session:
+                session.close()
 
     def similarity_search(
         self,
@@ -147,12 +160,12 @@ class VectorStoreService:
                         de.chunk_index,
                         de.content,
                         de.metadata,
-                        1 - (de.embedding <=> CAST(:query_embedding AS vector)) as similarity
+                        1 - (de.embedding <=> CAST(:query_embedding AS halfvec)) as similarity
                     FROM document_embeddings de
                     JOIN documents d ON de.document_id = d.id
                     WHERE d.user_id = CAST(:user_id AS UUID)
                     AND de.document_id = ANY(CAST(:document_ids AS UUID[]))
-                    ORDER BY de.embedding <=> CAST(:query_embedding AS vector)
+                    ORDER BY de.embedding <=> CAST(:query_embedding AS halfvec)
                     LIMIT :top_k
                 """)
 
@@ -172,11 +185,11 @@ class VectorStoreService:
                         de.chunk_index,
                         de.content,
                         de.metadata,
-                        1 - (de.embedding <=> CAST(:query_embedding AS vector)) as similarity
+                        1 - (de.embedding <=> CAST(:query_embedding AS halfvec)) as similarity
                     FROM document_embeddings de
                     JOIN documents d ON de.document_id = d.id
                     WHERE d.user_id = CAST(:user_id AS UUID)
-                    ORDER BY de.embedding <=> CAST(:query_embedding AS vector)
+                    ORDER BY de.embedding <=> CAST(:query_embedding AS halfvec)
                     LIMIT :top_k
                 """)
 
@@ -256,13 +269,10 @@ class VectorStoreService:
 
         for emb in embeddings:
             if emb.embedding is not None:
-                doc_vec = np.array(emb.embedding)
+                doc_vec = emb.embedding.to_numpy().astype(np.float32)
 
-                # Cosine similarity
-                similarity = float(
-                    np.dot(query_vec, doc_vec) /
-                    (np.linalg.norm(query_vec) * np.linalg.norm(doc_vec))
-                )
+                # Cosine similarity (a plain dot product for unit-norm embeddings)
+                similarity = self.embeddings_service.similarity(query_vec, doc_vec)
 
                 if similarity >= score_threshold:
                     results.append(SearchResult(
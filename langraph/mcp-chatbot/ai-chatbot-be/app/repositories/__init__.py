@@ -12,11 +12,15 @@ Enterprise Rationale:
 
 from app.repositories.base import BaseRepository, ReadOnlyRepository
 from app.repositories.chat_history import chat_history_repository
-from app.repositories.supabase_document import supabase_document_repository
+from app.repositories.supabase_document import (
+    SupabaseDocumentRepository,
+    get_supabase_document_repository,
+)
 
 __all__ = [
     "BaseRepository",
     "ReadOnlyRepository",
     "chat_history_repository",
-    "supabase_document_repository",
+    "SupabaseDocumentRepository",
+    "get_supabase_document_repository",
 ]
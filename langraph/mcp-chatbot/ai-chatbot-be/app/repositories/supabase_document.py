@@ -17,10 +17,16 @@ Enterprise Rationale:
 - Type safety: Clear interfaces for all operations
 """
 
-from typing import List, Optional, Dict, Any, BinaryIO
+from typing import List, Optional, Dict, Any, BinaryIO, AsyncIterator, FrozenSet, Tuple, Union
 from uuid import UUID
+from functools import lru_cache
+import asyncio
+import base64
+import io
 import logging
 from pathlib import Path
+import httpx
+from cachetools import LRUCache, TTLCache
 from supabase import create_client, Client
 from supabase.lib.client_options import ClientOptions
 
@@ -37,6 +43,16 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Chunk size used when streaming objects to and from storage
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Supabase's resumable (TUS) endpoint requires 6 MB chunks
+RESUMABLE_CHUNK_SIZE = 6 * 1024 * 1024
+# Anything that fits in one TUS chunk gains nothing from resuming, so only
+# larger uploads take the resumable path
+RESUMABLE_THRESHOLD = RESUMABLE_CHUNK_SIZE
+TUS_VERSION = "1.0.0"
+
 
 class SupabaseDocumentRepository:
     """
@@ -77,7 +93,32 @@ class SupabaseDocumentRepository:
                 self.supabase_url,
                 self.supabase_key
             )
+            # Long-lived async HTTP/2 client for the Storage REST API.
+            # Reusing pooled connections avoids a TLS handshake per call and
+            # keeps storage I/O off the thread pool.
+            self._http = httpx.AsyncClient(
+                base_url=f"{self.supabase_url.rstrip('/')}/storage/v1",
+                headers={
+                    "Authorization": f"Bearer {self.supabase_key}",
+                    "apikey": self.supabase_key,
+                },
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                timeout=60,
+            )
             logger.info(f"Supabase storage client initialized for bucket: {self.bucket_name}")
+            
+            # Short-lived cache of directory listings keyed by (path, limit, offset)
+            self._list_cache: TTLCache = TTLCache(
+                maxsize=1024,
+                ttl=settings.storage_list_ttl_seconds
+            )
+            # One fill lock per directory, bounded like the cache it guards; an
+            # evicted lock only costs a duplicate fetch, never a wrong result
+            self._list_locks: LRUCache = LRUCache(maxsize=1024)
+            
+            # Public URLs are deterministic per bucket/path, so memoize them
+            self._public_url_cache: LRUCache = LRUCache(maxsize=4096)
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {str(e)}")
             raise StorageConfigurationException(
@@ -110,9 +151,51 @@ class SupabaseDocumentRepository:
                 details={"missing_field": "supabase_storage_bucket"}
             )
     
+    @staticmethod
+    def _split_path(file_path: str) -> Tuple[str, str]:
+        """
+        Split a storage path into its directory and filename.
+        
+        Args:
+            file_path: Path to the file in storage
+        
+        Returns:
+            Tuple of (directory, filename)
+        """
+        path_parts = file_path.strip("/").rsplit("/", 1)
+        directory = path_parts[0] if len(path_parts) > 1 else ""
+        return directory, path_parts[-1]
+    
+    def _public_url(self, file_path: str) -> str:
+        """
+        Return the public URL for a file, building it only on first use.
+        
+        Args:
+            file_path: Path to the file in storage
+        
+        Returns:
+            Public URL
+        """
+        public_url = self._public_url_cache.get(file_path)
+        if public_url is None:
+            public_url = self.client.storage.from_(self.bucket_name).get_public_url(file_path)
+            self._public_url_cache[file_path] = public_url
+        return public_url
+    
+    def _invalidate_listing(self, file_path: str) -> None:
+        """
+        Drop cached listings for the directory containing a file.
+        
+        Args:
+            file_path: Path to the file that changed
+        """
+        directory, _ = self._split_path(file_path)
+        for key in [k for k in self._list_cache if k[0].strip("/") == directory]:
+            self._list_cache.pop(key, None)
+    
     async def upload_document(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, AsyncIterator[bytes]],
         file_path: str,
         content_type: str = "application/octet-stream",
         metadata: Optional[Dict[str, Any]] = None
@@ -121,7 +204,8 @@ class SupabaseDocumentRepository:
         Upload a document to Supabase Storage.
         
         Args:
-            file_content: Binary file content
+            file_content: Binary file content, or an async iterator of byte
+                chunks which is streamed to storage without buffering
             file_path: Path where file should be stored (e.g., "user_id/filename.pdf")
             content_type: MIME type of the file
             metadata: Optional metadata to attach to the file
@@ -133,22 +217,24 @@ class SupabaseDocumentRepository:
             StorageUploadException: If upload fails
         """
         try:
-            logger.info(f"Uploading document to {self.bucket_name}/{file_path}")
+            logger.debug("Uploading document to %s/%s", self.bucket_name, file_path)
             
             # Upload file to Supabase Storage
-            response = self.client.storage.from_(self.bucket_name).upload(
-                path=file_path,
-                file=file_content,
-                file_options={
+            response = await self._http.post(
+                f"/object/{self.bucket_name}/{file_path}",
+                content=file_content,
+                headers={
                     "content-type": content_type,
-                    "upsert": "true"  # Overwrite if exists
+                    "x-upsert": "true"  # Overwrite if exists
                 }
             )
+            response.raise_for_status()
+            self._invalidate_listing(file_path)
             
             # Get public URL
-            public_url = self.client.storage.from_(self.bucket_name).get_public_url(file_path)
+            public_url = self._public_url(file_path)
             
-            logger.info(f"Successfully uploaded document: {file_path}")
+            logger.info("Successfully uploaded document: %s", file_path)
             return public_url
         
         except Exception as e:
@@ -159,6 +245,106 @@ class SupabaseDocumentRepository:
                 details={"error": str(e), "content_type": content_type}
             )
     
+    async def upload_document_resumable(
+        self,
+        file_content: Union[bytes, BinaryIO],
+        file_path: str,
+        content_type: str = "application/octet-stream",
+        chunk_size: int = RESUMABLE_CHUNK_SIZE,
+        max_retries: int = 3
+    ) -> str:
+        """
+        Upload a large document in chunks using Supabase's resumable (TUS) API.
+        
+        A failed chunk is retried from the offset the server reports, so a
+        dropped connection only costs the current chunk rather than the whole
+        file. TUS requires chunks to be sent in order, so chunks are uploaded
+        sequentially over the pooled connection.
+        
+        Args:
+            file_content: Binary file content, or a seekable file object which
+                is read one chunk at a time
+            file_path: Path where file should be stored (e.g., "user_id/filename.pdf")
+            content_type: MIME type of the file
+            chunk_size: Bytes per PATCH request
+            max_retries: Attempts per chunk before giving up
+        
+        Returns:
+            Public URL of the uploaded file
+        
+        Raises:
+            StorageUploadException: If upload fails
+        """
+        def b64(value: str) -> str:
+            return base64.b64encode(value.encode()).decode()
+        
+        try:
+            logger.debug("Starting resumable upload to %s/%s", self.bucket_name, file_path)
+            
+            if isinstance(file_content, (bytes, bytearray)):
+                file_content = io.BytesIO(file_content)
+            total = file_content.seek(0, io.SEEK_END)
+            response = await self._http.post(
+                "/upload/resumable",
+                headers={
+                    "Tus-Resumable": TUS_VERSION,
+                    "Upload-Length": str(total),
+                    "Upload-Metadata": ",".join([
+                        f"bucketName {b64(self.bucket_name)}",
+                        f"objectName {b64(file_path)}",
+                        f"contentType {b64(content_type)}",
+                    ]),
+                    "x-upsert": "true"
+                }
+            )
+            response.raise_for_status()
+            upload_url = response.headers["Location"]
+            
+            offset = 0
+            attempts = 0
+            while offset < total:
+                file_content.seek(offset)
+                chunk = await asyncio.to_thread(file_content.read, chunk_size)
+                try:
+                    response = await self._http.patch(
+                        upload_url,
+                        content=chunk,
+                        headers={
+                            "Tus-Resumable": TUS_VERSION,
+                            "Upload-Offset": str(offset),
+                            "Content-Type": "application/offset+octet-stream"
+                        }
+                    )
+                    response.raise_for_status()
+                    offset = int(response.headers["Upload-Offset"])
+                    attempts = 0
+                except httpx.HTTPError as e:
+                    attempts += 1
+                    if attempts >= max_retries:
+                        raise
+                    logger.warning("Chunk at offset %s of %s failed, resuming: %s", offset, file_path, e)
+                    # Ask the server how much it actually received
+                    head = await self._http.head(
+                        upload_url,
+                        headers={"Tus-Resumable": TUS_VERSION}
+                    )
+                    head.raise_for_status()
+                    offset = int(head.headers["Upload-Offset"])
+            
+            self._invalidate_listing(file_path)
+            public_url = self._public_url(file_path)
+            
+            logger.info("Successfully uploaded document (resumable): %s", file_path)
+            return public_url
+        
+        except Exception as e:
+            logger.error(f"Failed resumable upload of {file_path}: {str(e)}", exc_info=True)
+            raise StorageUploadException(
+                filename=file_path,
+                message=f"Resumable upload failed: {str(e)}",
+                details={"error": str(e), "content_type": content_type}
+            )
+    
     async def download_document(self, file_path: str) -> bytes:
         """
         Download a document from Supabase Storage.
@@ -173,13 +359,14 @@ class SupabaseDocumentRepository:
             StorageDownloadException: If download fails
         """
         try:
-            logger.info(f"Downloading document from {self.bucket_name}/{file_path}")
+            logger.debug("Downloading document from %s/%s", self.bucket_name, file_path)
             
             # Download file from Supabase Storage
-            response = self.client.storage.from_(self.bucket_name).download(file_path)
+            response = await self._http.get(f"/object/{self.bucket_name}/{file_path}")
+            response.raise_for_status()
             
-            logger.info(f"Successfully downloaded document: {file_path}")
-            return response
+            logger.debug("Successfully downloaded document: %s", file_path)
+            return response.content
         
         except Exception as e:
             logger.error(f"Failed to download document {file_path}: {str(e)}", exc_info=True)
@@ -189,6 +376,40 @@ class SupabaseDocumentRepository:
                 details={"error": str(e)}
             )
     
+    async def stream_document(
+        self,
+        file_path: str,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a document from Supabase Storage chunk by chunk.
+        
+        Args:
+            file_path: Path to the file in storage
+            chunk_size: Size of each yielded chunk in bytes
+        
+        Yields:
+            Binary file content chunks
+        
+        Raises:
+            StorageDownloadException: If download fails
+        """
+        try:
+            logger.debug("Streaming document from %s/%s", self.bucket_name, file_path)
+            
+            async with self._http.stream("GET", f"/object/{self.bucket_name}/{file_path}") as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+        
+        except Exception as e:
+            logger.error(f"Failed to stream document {file_path}: {str(e)}", exc_info=True)
+            raise StorageDownloadException(
+                filename=file_path,
+                message=f"Download failed: {str(e)}",
+                details={"error": str(e)}
+            )
+    
     async def list_documents(
         self,
         path: str = "",
@@ -198,6 +419,9 @@ class SupabaseDocumentRepository:
         """
         List documents in Supabase Storage.
         
+        Results are cached for ``storage_list_ttl_seconds`` and invalidated
+        when a file in the listed directory is uploaded or deleted.
+        
         Args:
             path: Path prefix to filter by (e.g., "user_id/")
             limit: Maximum number of files to return
@@ -209,20 +433,43 @@ class SupabaseDocumentRepository:
         Raises:
             StorageListException: If listing fails
         """
+        files, _ = await self._list_with_cache(path, limit, offset)
+        return files
+    
+    async def _list_with_cache(
+        self,
+        path: str = "",
+        limit: int = 100,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], FrozenSet[str]]:
+        """
+        Return a cached listing together with the set of file names in it.
+        
+        The name set is built once per cache fill so ``exists`` can do an
+        O(1) membership test instead of scanning the listing.
+        
+        Raises:
+            StorageListException: If listing fails
+        """
+        cache_key = (path, limit, offset)
+        cached = self._list_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            logger.info(f"Listing documents in {self.bucket_name}/{path}")
-            
-            # List files in Supabase Storage
-            response = self.client.storage.from_(self.bucket_name).list(
-                path=path,
-                options={
-                    "limit": limit,
-                    "offset": offset
-                }
-            )
-            
-            logger.info(f"Successfully listed {len(response)} documents")
-            return response
+            lock = self._list_locks.get(path)
+            if lock is None:
+                lock = self._list_locks[path] = asyncio.Lock()
+            async with lock:
+                # Another request may have filled the cache while we waited
+                cached = self._list_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                
+                files = await self._fetch_listing(path, limit, offset)
+                entry = (files, frozenset(f["name"] for f in files if "name" in f))
+                self._list_cache[cache_key] = entry
+                return entry
         
         except Exception as e:
             logger.error(f"Failed to list documents in {path}: {str(e)}", exc_info=True)
@@ -232,6 +479,41 @@ class SupabaseDocumentRepository:
                 details={"error": str(e), "limit": limit, "offset": offset}
             )
     
+    async def _fetch_listing(
+        self,
+        path: str,
+        limit: int,
+        offset: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a directory listing from Supabase Storage, bypassing the cache.
+        
+        Args:
+            path: Path prefix to filter by
+            limit: Maximum number of files to return
+            offset: Number of files to skip
+        
+        Returns:
+            List of file metadata dictionaries
+        """
+        logger.debug("Listing documents in %s/%s", self.bucket_name, path)
+        
+        # List files in Supabase Storage
+        response = await self._http.post(
+            f"/object/list/{self.bucket_name}",
+            json={
+                "prefix": path,
+                "limit": limit,
+                "offset": offset,
+                "sortBy": {"column": "name", "order": "asc"}
+            }
+        )
+        response.raise_for_status()
+        files = response.json()
+        
+        logger.debug("Successfully listed %d documents", len(files))
+        return files
+    
     async def delete_document(self, file_path: str) -> bool:
         """
         Delete a document from Supabase Storage.
@@ -246,12 +528,19 @@ class SupabaseDocumentRepository:
             StorageDeleteException: If deletion fails
         """
         try:
-            logger.info(f"Deleting document from {self.bucket_name}/{file_path}")
+            logger.debug("Deleting document from %s/%s", self.bucket_name, file_path)
             
             # Delete file from Supabase Storage
-            response = self.client.storage.from_(self.bucket_name).remove([file_path])
+            response = await self._http.request(
+                "DELETE",
+                f"/object/{self.bucket_name}",
+                json={"prefixes": [file_path]}
+            )
+            response.raise_for_status()
+            self._invalidate_listing(file_path)
+            self._public_url_cache.pop(file_path, None)
             
-            logger.info(f"Successfully deleted document: {file_path}")
+            logger.info("Successfully deleted document: %s", file_path)
             return True
         
         except Exception as e:
@@ -273,8 +562,7 @@ class SupabaseDocumentRepository:
             Public URL
         """
         try:
-            public_url = self.client.storage.from_(self.bucket_name).get_public_url(file_path)
-            return public_url
+            return self._public_url(file_path)
         except Exception as e:
             logger.error(f"Failed to get public URL for {file_path}: {str(e)}")
             raise StorageException(
@@ -294,17 +582,32 @@ class SupabaseDocumentRepository:
             True if file exists, False otherwise
         """
         try:
-            # Try to get file info
-            path_parts = file_path.rsplit("/", 1)
-            directory = path_parts[0] if len(path_parts) > 1 else ""
-            filename = path_parts[-1]
+            # Listings are cached, so repeated checks in one directory are cheap
+            directory, filename = self._split_path(file_path)
             
-            files = await self.list_documents(path=directory)
-            return any(f.get("name") == filename for f in files)
+            _, names = await self._list_with_cache(path=directory)
+            return filename in names
         except Exception as e:
-            logger.warning(f"Error checking if file exists {file_path}: {str(e)}")
+            logger.warning("Error checking if file exists %s: %s", file_path, e)
             return False
+    
+    async def close(self) -> None:
+        """
+        Close the pooled Storage HTTP client.
+        
+        Should be called once on application shutdown.
+        """
+        await self._http.aclose()
+        logger.info("Supabase storage HTTP client closed")
 
 
-# Global repository instance (DI-friendly)
-supabase_document_repository = SupabaseDocumentRepository()
+@lru_cache(maxsize=1)
+def get_supabase_document_repository() -> SupabaseDocumentRepository:
+    """
+    Return the process-wide storage repository, creating it on first use.
+    
+    Construction is deferred until the first request so importing this
+    module has no side effects. Use as a FastAPI dependency:
+    ``Depends(get_supabase_document_repository)``.
+    """
+    return SupabaseDocumentRepository()
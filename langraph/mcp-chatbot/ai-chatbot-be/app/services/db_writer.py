@@ -0,0 +1,174 @@
+"""
+Coalescing Database Writer
+==========================
+Write-behind queue for small bookkeeping updates.
+
+Updates are enqueued without blocking the caller. A background task drains
+the queue every ``flush_interval`` seconds, merges patches that target the
+same row (later values win), and writes each table's rows in a single
+bulk update. Under bursty load this turns one DB round trip per request
+into one per flush interval. A failed bulk update is retried with backoff
+before the batch is given up on.
+
+The flush loop is owned by the app lifespan: ``start()`` on startup and
+``stop()`` on shutdown, which writes anything still queued.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.database.crud import db_client
+
+logger = logging.getLogger(__name__)
+
+# Queue marker telling the flush loop to write what it has and exit
+_STOP = object()
+
+
+@dataclass
+class PendingWrite:
+    """A partial update for one row."""
+    table: str
+    pk: str
+    patch: Dict[str, Any]
+
+
+class CoalescingWriter:
+    """
+    Background writer that batches and coalesces row updates.
+
+    Features:
+    - Non-blocking enqueue from request handlers
+    - Per-row patch merging before each flush
+    - One bulk update per table per flush
+    - Bounded retries with exponential backoff for failed flushes
+    - Flushes remaining writes on shutdown
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.05,
+        max_batch: int = 500,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+    ):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background flush loop (requires a running event loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Coalescing DB writer started")
+
+    async def stop(self) -> None:
+        """Stop the flush loop after writing anything still queued."""
+        if self._task is not None and not self._task.done():
+            self._queue.put_nowait(_STOP)
+            await self._task
+        self._task = None
+        logger.info("Coalescing DB writer stopped")
+
+    def enqueue(self, table: str, pk: str, patch: Dict[str, Any]) -> None:
+        """
+        Queue a partial update for a row.
+
+        The write is sent by the flush loop, which the app lifespan starts.
+
+        Args:
+            table: Table name
+            pk: Primary key (id) of the row
+            patch: Columns to update
+        """
+        self._queue.put_nowait(PendingWrite(table=table, pk=pk, patch=patch))
+
+    async def _run(self) -> None:
+        while True:
+            batch, stopping = await self._drain()
+            if batch:
+                await self._flush(batch)
+            if stopping:
+                return
+
+    async def _drain(self) -> Tuple[List[PendingWrite], bool]:
+        """
+        Wait for one write, then collect more until the interval elapses.
+
+        Returns:
+            Tuple of (writes, whether a stop was requested)
+        """
+        item = await self._queue.get()
+        if item is _STOP:
+            return self._drain_nowait(), True
+
+        batch = [item]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch + self._drain_nowait(), True
+            batch.append(item)
+
+        return batch, False
+
+    def _drain_nowait(self) -> List[PendingWrite]:
+        """Take everything currently queued without waiting."""
+        items = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                items.append(item)
+        return items
+
+    @staticmethod
+    def _coalesce(batch: List[PendingWrite]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Group writes by table and merge patches per row in arrival order."""
+        grouped: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for write in batch:
+            grouped.setdefault(write.table, {}).setdefault(write.pk, {}).update(write.patch)
+        return grouped
+
+    async def _flush(self, batch: List[PendingWrite]) -> None:
+        for table, rows in self._coalesce(batch).items():
+            payload = [{"id": pk, **patch} for pk, patch in rows.items()]
+            await self._write_with_retry(table, payload)
+
+    async def _write_with_retry(self, table: str, payload: List[Dict[str, Any]]) -> None:
+        """Bulk-update one table, retrying with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(db_client.table(table).bulk_update(payload).execute)
+                logger.debug(f"Flushed {len(payload)} coalesced update(s) to {table}")
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    ids = [row["id"] for row in payload]
+                    logger.error(
+                        f"Dropping {len(payload)} update(s) to {table} after "
+                        f"{attempt + 1} attempts: {str(e)}; ids={ids}"
+                    )
+                    return
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning(
+                    f"Failed to flush {len(payload)} update(s) to {table}, "
+                    f"retrying in {delay:.2f}s: {str(e)}"
+                )
+                await asyncio.sleep(delay)
+
+
+# Global instance
+db_writer = CoalescingWriter()
@@ -4,19 +4,32 @@ Document Processor Service
 Production document processing pipeline using RAG services.
 """
 
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, BinaryIO, Union
 import io
 
 from langchain_core.documents import Document
 
-from app.services.supabase_client import supabase_client
+from app.core.config import settings
+from app.services.db_writer import db_writer
 from app.rag.documents.loader import DocumentLoaderService, document_loader
 from app.rag.documents.splitter import TextSplitterService, text_splitter, ChunkingStrategy
 from app.rag.retrieval.vector_store import VectorStoreService, get_vector_store
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True, frozen=True)
+class ChunkDTO:
+    """Lightweight chunk result returned by search and chunk listing."""
+    content: str
+    chunk_index: int
+    metadata: Dict[str, Any]
+    score: Optional[float] = None
+    document_id: Optional[str] = None
+
 
 class DocumentProcessor:
     """
@@ -39,7 +52,7 @@ class DocumentProcessor:
     async def process_document(
         self,
         document_id: str,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         content_type: str,
         filename: str = "document",
         metadata: Optional[Dict[str, Any]] = None
@@ -49,7 +62,7 @@ class DocumentProcessor:
 
         Args:
             document_id: Unique document ID
-            file_content: Raw file bytes
+            file_content: Raw file bytes or an open binary stream
             content_type: MIME type
             filename: Original filename
             metadata: Additional metadata
@@ -67,9 +80,11 @@ class DocumentProcessor:
         try:
             logger.info(f"Processing document {document_id}: {filename} ({content_type})")
 
-            # Step 1: Load document
+            # Step 1: Load document from a single in-place buffer; BytesIO
+            # shares the bytes object rather than copying it
+            buffer = file_content if hasattr(file_content, "read") else io.BytesIO(file_content)
             documents = self.document_loader.load_from_bytes(
-                content=file_content,
+                content=buffer,
                 content_type=content_type,
                 filename=filename,
                 metadata={
@@ -92,16 +107,13 @@ class DocumentProcessor:
             logger.info(f"Created {len(chunks)} chunks")
 
             # Step 3: Add to vector store (embeddings generated automatically)
-            added_count = self.vector_store.add_documents(
-                documents=chunks,
-                document_id=document_id,
-            )
+            added_count = await self._add_chunks(chunks, document_id)
 
-            # Step 4: Update document status
-            supabase_client.table("documents").update({
+            # Step 4: Update document status (bookkeeping, written behind)
+            db_writer.enqueue("documents", document_id, {
                 "processed": True,
                 "error": None
-            }).eq("id", document_id).execute()
+            })
 
             result["success"] = True
             result["chunks_created"] = added_count
@@ -116,18 +128,49 @@ class DocumentProcessor:
             logger.error(f"Error processing document {document_id}: {error_msg}")
 
             # Update document with error
-            supabase_client.table("documents").update({
+            db_writer.enqueue("documents", document_id, {
                 "processed": False,
                 "error": error_msg
-            }).eq("id", document_id).execute()
+            })
 
             result["error"] = error_msg
             return result
 
+    async def _add_chunks(self, chunks: List[Document], document_id: str) -> int:
+        """
+        Embed and store chunks in concurrent batches.
+
+        Batches run in worker threads, bounded by a semaphore so the number
+        of in-flight embedding calls and DB sessions stays under the pool limit.
+
+        Args:
+            chunks: Chunks to add
+            document_id: Parent document ID
+
+        Returns:
+            Number of chunks added
+        """
+        batch_size = settings.document_chunk_batch_size
+        semaphore = asyncio.Semaphore(settings.document_processing_concurrency)
+
+        async def add_batch(start: int) -> int:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.vector_store.add_documents,
+                    documents=chunks[start:start + batch_size],
+                    document_id=document_id,
+                    start_index=start,
+                )
+
+        counts = await asyncio.gather(
+            *(add_batch(start) for start in range(0, len(chunks), batch_size))
+        )
+        return sum(counts)
+
     async def reprocess_document(
         self,
         document_id: str,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         content_type: str,
         filename: str = "document"
     ) -> Dict[str, Any]:
@@ -136,7 +179,7 @@ class DocumentProcessor:
 
         Args:
             document_id: Document ID
-            file_content: Raw file bytes
+            file_content: Raw file bytes or an open binary stream
             content_type: MIME type
             filename: Original filename
 
@@ -173,7 +216,7 @@ class DocumentProcessor:
         user_id: str,
         document_ids: Optional[List[str]] = None,
         top_k: int = 5
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ChunkDTO]:
         """
         Search for relevant document chunks.
 
@@ -194,13 +237,13 @@ class DocumentProcessor:
         )
 
         return [
-            {
-                "content": r.content,
-                "score": r.score,
-                "document_id": r.document_id,
-                "chunk_index": r.chunk_index,
-                "metadata": r.metadata,
-            }
+            ChunkDTO(
+                content=r.content,
+                chunk_index=r.chunk_index,
+                metadata=r.metadata,
+                score=r.score,
+                document_id=r.document_id,
+            )
             for r in results
         ]
 
@@ -208,7 +251,7 @@ class DocumentProcessor:
         self,
         document_id: str,
         limit: int = 100
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ChunkDTO]:
         """
         Get all chunks for a document.
 
@@ -222,11 +265,11 @@ class DocumentProcessor:
         results = self.vector_store.get_document_chunks(document_id, limit)
 
         return [
-            {
-                "content": r.content,
-                "chunk_index": r.chunk_index,
-                "metadata": r.metadata,
-            }
+            ChunkDTO(
+                content=r.content,
+                chunk_index=r.chunk_index,
+                metadata=r.metadata,
+            )
             for r in results
         ]
 
@@ -236,5 +279,12 @@ class DocumentProcessor:
         return DocumentLoaderService.is_supported(content_type)
 
 
-# Global instance
-doc_processor = DocumentProcessor()
+@lru_cache(maxsize=1)
+def get_document_processor() -> DocumentProcessor:
+    """
+    Return the process-wide document processor, creating it on first use.
+
+    Construction loads the vector store and embeddings service, so it is
+    deferred until the first upload instead of happening at import.
+    """
+    return DocumentProcessor()
@@ -1,234 +1,299 @@
-import smtplib
-import random
-import string
+import asyncio
+import logging
+import secrets
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from jinja2 import Template
+from email.utils import formataddr
+from jinja2 import Environment
 from app.core.config import settings
+from app.services.smtp_pool import SMTPConnectionPool
 from app.services.supabase_client import supabase_client
 
+logger = logging.getLogger(__name__)
+
+# Email templates are compiled once at import; autoescaping guards user-supplied names
+_jinja_env = Environment(autoescape=True)
+
+_VERIFICATION_TEMPLATE = _jinja_env.from_string(
+    """
+    <html>
+    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <div style="background-color: #f8f9fa; padding: 30px; border-radius: 10px; text-align: center;">
+            <h1 style="color: #333; margin-bottom: 30px;">Email Verification</h1>
+            <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
+                {% if full_name %}Hi {{ full_name }},{% else %}Hi,{% endif %}
+            </p>
+            <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
+                Thank you for registering with AI Chatbot! Please use the following OTP to verify your email address:
+            </p>
+            <div style="background-color: #007bff; color: white; padding: 20px; border-radius: 5px; font-size: 24px; font-weight: bold; letter-spacing: 5px; margin: 30px 0;">
+                {{ otp }}
+            </div>
+            <p style="font-size: 14px; color: #999;">
+                This OTP will expire in 10 minutes. If you didn't request this verification, please ignore this email.
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+)
+
+_PASSWORD_RESET_TEMPLATE = _jinja_env.from_string(
+    """
+    <html>
+    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <div style="background-color: #f8f9fa; padding: 30px; border-radius: 10px; text-align: center;">
+            <h1 style="color: #333; margin-bottom: 30px;">Password Reset</h1>
+            <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
+                {% if full_name %}Hi {{ full_name }},{% else %}Hi,{% endif %}
+            </p>
+            <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
+                You requested a password reset for your AI Chatbot account. Please use the following OTP to reset your password:
+            </p>
+            <div style="background-color: #dc3545; color: white; padding: 20px; border-radius: 5px; font-size: 24px; font-weight: bold; letter-spacing: 5px; margin: 30px 0;">
+                {{ otp }}
+            </div>
+            <p style="font-size: 14px; color: #999;">
+                This OTP will expire in 10 minutes. If you didn't request a password reset, please ignore this email.
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+)
+
+_PASSWORD_CHANGED_TEMPLATE = _jinja_env.from_string(
+    """
+    <html>
+    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <div style="background-color: #f8f9fa; padding: 30px; border-radius: 10px; text-align: center;">
+            <h1 style="color: #333; margin-bottom: 30px;">Password Changed Successfully</h1>
+            <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
+                {% if full_name %}Hi {{ full_name }},{% else %}Hi,{% endif %}
+            </p>
+            <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
+                Your password has been successfully changed for your AI Chatbot account.
+            </p>
+            <div style="background-color: #28a745; color: white; padding: 20px; border-radius: 5px; margin: 30px 0;">
+                <strong>✓ Password Updated</strong>
+            </div>
+            <p style="font-size: 14px; color: #999;">
+                If you didn't make this change, please contact our support team immediately.
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+)
+
+_EMAIL_TEMPLATES = {
+    "verification": ("Email Verification - AI Chatbot", _VERIFICATION_TEMPLATE),
+    "password_reset": ("Password Reset - AI Chatbot", _PASSWORD_RESET_TEMPLATE),
+    "password_changed": ("Password Changed - AI Chatbot", _PASSWORD_CHANGED_TEMPLATE),
+}
+
+
+@dataclass
+class EmailJob:
+    """An email waiting to be rendered and sent"""
+    kind: str
+    email: str
+    full_name: Optional[str] = None
+    otp: Optional[str] = None
+
 
 class EmailService:
     def __init__(self):
-        self.conf = ConnectionConfig(
-            MAIL_USERNAME=settings.mail_username,
-            MAIL_PASSWORD=settings.mail_password,
-            MAIL_FROM=settings.mail_from,
-            MAIL_PORT=settings.mail_port,
-            MAIL_SERVER=settings.mail_server,
-            MAIL_FROM_NAME=settings.mail_from_name,
-            MAIL_STARTTLS=settings.mail_starttls,
-            MAIL_SSL_TLS=settings.mail_ssl_tls,
-            USE_CREDENTIALS=True,
-            VALIDATE_CERTS=True,
-        )
-        self.fastmail = FastMail(self.conf)
+        # Warm SMTP connections shared by all workers
+        self._smtp_pool = SMTPConnectionPool()
+
+        # Handlers enqueue jobs; workers render and send them off the request path.
+        # The queue is in memory only: shutdown drains it, a crash loses it
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        self._workers: List[asyncio.Task] = []
 
     def generate_otp(self, length: int = 6) -> str:
-        """Generate a random OTP"""
-        return "".join(random.choices(string.digits, k=length))
+        """Generate a cryptographically secure random OTP"""
+        return f"{secrets.randbelow(10 ** length):0{length}d}"
 
     def store_otp(self, email: str, otp: str, purpose: str = "verification"):
         """Store OTP in database with expiration"""
         try:
-            # Delete any existing OTPs for this email and purpose
-            supabase_client.table("otps").delete().eq("email", email).eq(
-                "purpose", purpose
+            # Replace any existing OTP for this email and purpose with a new
+            # one expiring in 10 minutes, atomically and in one round trip
+            expiry_time = datetime.utcnow() + timedelta(minutes=10)
+            supabase_client.rpc(
+                "upsert_otp",
+                {
+                    "p_email": email,
+                    "p_otp": otp,
+                    "p_purpose": purpose,
+                    "p_expires_at": expiry_time.isoformat(),
+                },
             ).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error storing {purpose} OTP for {email}: {e}")
+            return False
 
-            # Store new OTP with 10 minutes expiration
+    def store_otps_bulk(self, rows: List[Tuple[str, str]], purpose: str = "verification"):
+        """Store OTPs for many recipients in one round trip instead of N"""
+        if not rows:
+            return True
+        try:
+            # The RPC replaces old OTPs and inserts the new ones in a single
+            # transaction, so a failed insert never leaves recipients without one
             expiry_time = datetime.utcnow() + timedelta(minutes=10)
-            otp_data = {
-                "email": email,
-                "otp": otp,
-                "purpose": purpose,
-                "expires_at": expiry_time.isoformat(),
-                "used": False,
-            }
-
-            supabase_client.table("otps").insert(otp_data).execute()
+            supabase_client.rpc(
+                "upsert_otps_bulk",
+                {
+                    "p_emails": [email for email, _ in rows],
+                    "p_otps": [otp for _, otp in rows],
+                    "p_purpose": purpose,
+                    "p_expires_at": expiry_time.isoformat(),
+                },
+            ).execute()
             return True
         except Exception as e:
-            print(f"Error storing OTP: {str(e)}")
+            logger.error(f"Error storing {purpose} OTPs in bulk: {e}")
             return False
 
     async def verify_otp(self, email: str, otp: str, purpose: str = "verification") -> bool:
         """Verify OTP and mark it as used"""
         try:
-            # Get the OTP from database
-            result = (
-                supabase_client.table("otps")
-                .select("*")
-                .eq("email", email)
-                .eq("otp", otp)
-                .eq("purpose", purpose)
-                .eq("used", False)
-                .execute()
+            # The database checks expiry and single use in one atomic update;
+            # run it in a worker thread so the event loop isn't blocked
+            result = await asyncio.to_thread(
+                supabase_client.rpc(
+                    "consume_otp",
+                    {"p_email": email, "p_otp": otp, "p_purpose": purpose},
+                ).execute
             )
+            return bool(result.data and result.data[0]["consume_otp"])
+        except Exception as e:
+            logger.error("Error verifying OTP: %s", e)
+            return False
 
-            if not result.data:
-                return False
-
-            otp_record = result.data[0]
-
-            # Check if OTP is expired
-            expiry_time = datetime.fromisoformat(otp_record["expires_at"].replace("Z", "+00:00"))
-            if datetime.utcnow().replace(tzinfo=expiry_time.tzinfo) > expiry_time:
-                return False
-
-            # Mark OTP as used
-            supabase_client.table("otps").update({"used": True}).eq(
-                "id", otp_record["id"]
-            ).execute()
+    async def start_workers(self, count: int = None):
+        """Start background workers that render and send queued emails"""
+        if self._workers:
+            return
+        count = count or settings.email_workers
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(count)]
+
+    async def stop_workers(self):
+        """Send any queued emails, then stop the workers"""
+        if not self._workers:
+            return
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self._smtp_pool.close()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._render_and_send(job)
+            finally:
+                self._queue.task_done()
+
+    async def _enqueue(self, job: EmailJob):
+        """Hand a job to the workers; send inline if the queue is saturated"""
+        await self.start_workers()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await self._render_and_send(job)
 
+    async def _render_and_send(self, job: EmailJob) -> bool:
+        """Render and send one job; failures are logged, never raised"""
+        subject, template = _EMAIL_TEMPLATES[job.kind]
+        try:
+            message = MIMEText(template.render(otp=job.otp, full_name=job.full_name), "html", "utf-8")
+            message["Subject"] = subject
+            message["From"] = formataddr((settings.mail_from_name, settings.mail_from))
+            message["To"] = job.email
+            await self._smtp_pool.send_message(message)
             return True
         except Exception as e:
-            print(f"Error verifying OTP: {str(e)}")
+            # Queued sends have no caller left to report to, so the log is the record
+            logger.error(
+                "Failed to send %s email to %s (otp issued: %s): %s",
+                job.kind, job.email, job.otp is not None, e,
+            )
             return False
 
-    async def send_verification_email(self, email: str, full_name: str = None):
-        """Send email verification OTP"""
+    async def send_verification_email(self, email: str, full_name: str = None) -> bool:
+        """Store a verification OTP and queue the email for sending.
+
+        Returns True once the email is queued, not once it is delivered;
+        delivery failures are logged by the worker. Returns False if the OTP
+        could not be stored, in which case nothing is sent.
+        """
         try:
             otp = self.generate_otp()
 
-            # Store OTP in database
-            self.store_otp(email, otp, "verification")
-
-            # Email template
-            template = Template(
-                """
-            <html>
-            <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="background-color: #f8f9fa; padding: 30px; border-radius: 10px; text-align: center;">
-                    <h1 style="color: #333; margin-bottom: 30px;">Email Verification</h1>
-                    <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
-                        {% if full_name %}Hi {{ full_name }},{% else %}Hi,{% endif %}
-                    </p>
-                    <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
-                        Thank you for registering with AI Chatbot! Please use the following OTP to verify your email address:
-                    </p>
-                    <div style="background-color: #007bff; color: white; padding: 20px; border-radius: 5px; font-size: 24px; font-weight: bold; letter-spacing: 5px; margin: 30px 0;">
-                        {{ otp }}
-                    </div>
-                    <p style="font-size: 14px; color: #999;">
-                        This OTP will expire in 10 minutes. If you didn't request this verification, please ignore this email.
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            )
-
-            html_content = template.render(otp=otp, full_name=full_name)
-
-            message = MessageSchema(
-                subject="Email Verification - AI Chatbot",
-                recipients=[email],
-                body=html_content,
-                subtype="html",
-            )
+            # Store OTP before returning so a later resend always supersedes it
+            if not await asyncio.to_thread(self.store_otp, email, otp, "verification"):
+                return False
 
-            await self.fastmail.send_message(message)
+            await self._enqueue(EmailJob("verification", email, full_name, otp))
             return True
 
         except Exception as e:
-            print(f"Error sending verification email: {str(e)}")
+            logger.error(f"Error queueing verification email for {email}: {e}")
             return False
 
-    async def send_password_reset_email(self, email: str, full_name: str = None):
-        """Send password reset OTP"""
-        try:
-            otp = self.generate_otp()
+    async def send_bulk_verification_emails(
+        self, emails: List[str], concurrency: int = 50
+    ) -> Dict[str, bool]:
+        """Send verification OTPs to many recipients with one bulk OTP insert"""
+        otps = {email: self.generate_otp() for email in dict.fromkeys(emails)}
+        if not await asyncio.to_thread(self.store_otps_bulk, list(otps.items()), "verification"):
+            return dict.fromkeys(otps, False)
 
-            # Store OTP in database
-            self.store_otp(email, otp, "password_reset")
-
-            # Email template
-            template = Template(
-                """
-            <html>
-            <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="background-color: #f8f9fa; padding: 30px; border-radius: 10px; text-align: center;">
-                    <h1 style="color: #333; margin-bottom: 30px;">Password Reset</h1>
-                    <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
-                        {% if full_name %}Hi {{ full_name }},{% else %}Hi,{% endif %}
-                    </p>
-                    <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
-                        You requested a password reset for your AI Chatbot account. Please use the following OTP to reset your password:
-                    </p>
-                    <div style="background-color: #dc3545; color: white; padding: 20px; border-radius: 5px; font-size: 24px; font-weight: bold; letter-spacing: 5px; margin: 30px 0;">
-                        {{ otp }}
-                    </div>
-                    <p style="font-size: 14px; color: #999;">
-                        This OTP will expire in 10 minutes. If you didn't request a password reset, please ignore this email.
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            )
+        semaphore = asyncio.Semaphore(concurrency)
 
-            html_content = template.render(otp=otp, full_name=full_name)
+        async def send(email: str, otp: str) -> bool:
+            async with semaphore:
+                return await self._render_and_send(EmailJob("verification", email, None, otp))
 
-            message = MessageSchema(
-                subject="Password Reset - AI Chatbot",
-                recipients=[email],
-                body=html_content,
-                subtype="html",
-            )
+        results = await asyncio.gather(*(send(email, otp) for email, otp in otps.items()))
+        return dict(zip(otps, results))
 
-            await self.fastmail.send_message(message)
+    async def send_password_reset_email(self, email: str, full_name: str = None) -> bool:
+        """Store a password reset OTP and queue the email for sending.
+
+        Returns True once the email is queued, not once it is delivered;
+        returns False if the OTP could not be stored.
+        """
+        try:
+            otp = self.generate_otp()
+
+            # Store OTP before returning so a later request always supersedes it
+            if not await asyncio.to_thread(self.store_otp, email, otp, "password_reset"):
+                return False
+
+            await self._enqueue(EmailJob("password_reset", email, full_name, otp))
             return True
 
         except Exception as e:
-            print(f"Error sending password reset email: {str(e)}")
+            logger.error(f"Error queueing password reset email for {email}: {e}")
             return False
 
-    async def send_password_changed_notification(self, email: str, full_name: str = None):
-        """Send password changed notification"""
+    async def send_password_changed_notification(self, email: str, full_name: str = None) -> bool:
+        """Queue a password changed notification; True means queued, not delivered"""
         try:
-            # Email template
-            template = Template(
-                """
-            <html>
-            <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="background-color: #f8f9fa; padding: 30px; border-radius: 10px; text-align: center;">
-                    <h1 style="color: #333; margin-bottom: 30px;">Password Changed Successfully</h1>
-                    <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
-                        {% if full_name %}Hi {{ full_name }},{% else %}Hi,{% endif %}
-                    </p>
-                    <p style="font-size: 16px; color: #666; margin-bottom: 30px;">
-                        Your password has been successfully changed for your AI Chatbot account.
-                    </p>
-                    <div style="background-color: #28a745; color: white; padding: 20px; border-radius: 5px; margin: 30px 0;">
-                        <strong>✓ Password Updated</strong>
-                    </div>
-                    <p style="font-size: 14px; color: #999;">
-                        If you didn't make this change, please contact our support team immediately.
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            )
-
-            html_content = template.render(full_name=full_name)
-
-            message = MessageSchema(
-                subject="Password Changed - AI Chatbot",
-                recipients=[email],
-                body=html_content,
-                subtype="html",
-            )
-
-            await self.fastmail.send_message(message)
+            await self._enqueue(EmailJob("password_changed", email, full_name))
             return True
 
         except Exception as e:
-            print(f"Error sending password changed notification: {str(e)}")
+            logger.error(f"Error queueing password changed notification for {email}: {e}")
             return False
 
-
 email_service = EmailService()
@@ -1,21 +1,23 @@
 """
 Production LLM Factory
 ======================
-Thread-safe singleton factory for AWS Bedrock Claude LLM.
+Thread-safe factory for AWS Bedrock Claude LLM.
 
 Environment Variables Required:
 - AWS_ACCESS_KEY_ID
 - AWS_SECRET_ACCESS_KEY
 - AWS_REGION (default: us-east-1)
 - BEDROCK_MODEL_ID (default: us.anthropic.claude-3-5-sonnet-20241022-v2:0)
+- BEDROCK_MAX_POOL (default: 50)
 """
 
 import os
-import threading
 import logging
+from functools import lru_cache
 from typing import Optional
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 from langchain_aws import ChatBedrock
 
@@ -29,68 +31,148 @@ class LLMFactoryError(Exception):
     pass
 
 
+# Shared by every Bedrock client. Each open stream holds a pooled connection,
+# so the pool must cover peak concurrent streams; read_timeout allows long ones.
+_BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=settings.bedrock_max_pool,
+    tcp_keepalive=True,
+    connect_timeout=5,
+    read_timeout=3600,
+    retries={"max_attempts": 2, "mode": "adaptive"},
+)
+
+
+@lru_cache(maxsize=4)
+def _get_boto3_session(region: str) -> boto3.Session:
+    """
+    Return the boto3 session for a region, created once per process.
+
+    Credentials from settings/environment are passed to the session directly
+    rather than exported to os.environ or a global default session; when
+    unset, boto3's standard credential chain applies.
+    """
+    access_key = getattr(settings, 'aws_access_key_id', None) or os.getenv("AWS_ACCESS_KEY_ID")
+    secret_key = getattr(settings, 'aws_secret_access_key', None) or os.getenv("AWS_SECRET_ACCESS_KEY")
+
+    session = boto3.Session(
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region,
+    )
+    logger.info(f"AWS session configured for region: {region}")
+    return session
+
+
+@lru_cache(maxsize=4)
+def _get_bedrock_runtime(region: str):
+    """Return the shared bedrock-runtime client for a region."""
+    return _get_boto3_session(region).client(
+        "bedrock-runtime", region_name=region, config=_BEDROCK_CLIENT_CONFIG
+    )
+
+
+@lru_cache(maxsize=4)
+def _get_bedrock_control(region: str):
+    """Return the shared bedrock control-plane client for a region."""
+    return _get_boto3_session(region).client(
+        "bedrock", region_name=region, config=_BEDROCK_CLIENT_CONFIG
+    )
+
+
+@lru_cache(maxsize=4)
+def _list_models(region: str) -> frozenset:
+    """Return the Anthropic model IDs available in a region, fetched once."""
+    response = _get_bedrock_control(region).list_foundation_models(byProvider="anthropic")
+    return frozenset(m["modelId"] for m in response.get("modelSummaries", []))
+
+
+def _validate_model(model_id: str, region: str) -> None:
+    """
+    Validate model is accessible.
+
+    Opt-in via ``settings.bedrock_validate_model``; otherwise building an LLM
+    makes no control-plane call.
+
+    Cross-region models (us.anthropic.*, eu.anthropic.*, etc.) skip strict validation
+    since they may not appear in the regional model list.
+    """
+    if not settings.bedrock_validate_model:
+        return
+
+    # Cross-region models skip validation
+    if any(prefix in model_id for prefix in ["us.", "eu.", "ap."]):
+        logger.info(f"Cross-region model: {model_id} (validation skipped)")
+        return
+
+    try:
+        if model_id not in _list_models(region):
+            logger.warning(
+                f"Model {model_id} not in available list. "
+                f"Ensure it's enabled in AWS Console → Bedrock → Model access"
+            )
+
+    except ClientError as e:
+        if "AccessDenied" in str(e):
+            logger.debug("Cannot list models (AccessDenied) - assuming model available")
+        else:
+            raise
+
+
+@lru_cache(maxsize=16)
+def _build_llm(
+    model_id: str,
+    temperature: float,
+    max_tokens: int,
+    streaming: bool,
+    region: str
+) -> ChatBedrock:
+    """
+    Build a ChatBedrock instance, memoised per configuration.
+
+    Failed builds raise and are therefore never cached.
+    """
+    # Reuse the region's runtime client rather than building one per LLM
+    client = _get_bedrock_runtime(region)
+
+    # Validate model availability (non-blocking for cross-region models)
+    _validate_model(model_id, region)
+
+    llm = ChatBedrock(
+        model_id=model_id,
+        client=client,
+        streaming=streaming,
+        model_kwargs={
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+    )
+    logger.info(f"Bedrock LLM created: {model_id}")
+    return llm
+
+
 class LLMFactory:
     """
-    Thread-safe singleton factory for production LLM instances.
+    Thread-safe factory for production LLM instances.
+
+    Use ``get_llm_factory()`` to obtain the shared instance; it is created
+    on first use so importing this module has no side effects.
 
     Features:
-    - Singleton pattern with double-checked locking
     - LLM instance caching for performance
     - AWS credential management
     - Cross-region Bedrock model support
     """
 
-    _instance: Optional['LLMFactory'] = None
-    _lock = threading.Lock()
-    _cache_lock = threading.Lock()
-
     # Configuration defaults
     DEFAULT_REGION = "us-east-1"
     DEFAULT_MODEL = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
     DEFAULT_TEMPERATURE = 0.7
     DEFAULT_MAX_TOKENS = 4096
 
-    def __new__(cls) -> 'LLMFactory':
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialize()
-        return cls._instance
-
-    def _initialize(self) -> None:
+    def __init__(self) -> None:
         """Initialize factory state."""
-        self._llm_cache: dict = {}
-        self._credentials_configured = False
-        logger.info("LLMFactory singleton initialized")
-
-    def _configure_aws_credentials(self) -> None:
-        """Configure AWS credentials from environment/settings."""
-        if self._credentials_configured:
-            return
-
-        # Get credentials from settings or environment
-        access_key = getattr(settings, 'aws_access_key_id', None) or os.getenv("AWS_ACCESS_KEY_ID")
-        secret_key = getattr(settings, 'aws_secret_access_key', None) or os.getenv("AWS_SECRET_ACCESS_KEY")
-        region = getattr(settings, 'aws_region', None) or os.getenv("AWS_REGION", self.DEFAULT_REGION)
-
-        # Set environment variables for boto3
-        if access_key:
-            os.environ.setdefault("AWS_ACCESS_KEY_ID", access_key)
-        if secret_key:
-            os.environ.setdefault("AWS_SECRET_ACCESS_KEY", secret_key)
-        os.environ.setdefault("AWS_DEFAULT_REGION", region)
-        os.environ.setdefault("AWS_REGION", region)
-
-        # Configure default boto3 session
-        boto3.setup_default_session(
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=region
-        )
-
-        self._credentials_configured = True
-        logger.info(f"AWS credentials configured for region: {region}")
+        self._provider_info = self._resolve_provider_info()
+        logger.info("LLMFactory initialized")
 
     def create_llm(
         self,
@@ -120,44 +202,12 @@ class LLMFactory:
             getattr(settings, 'bedrock_model_id', None) or
             os.getenv("BEDROCK_MODEL_ID", self.DEFAULT_MODEL)
         )
-        cache_key = f"{model_id}_{temperature}_{max_tokens}_{streaming}"
-
-        # Return cached instance if available
-        with self._cache_lock:
-            if cache_key in self._llm_cache:
-                logger.debug(f"Returning cached LLM: {model_id}")
-                return self._llm_cache[cache_key]
-
-        # Configure credentials
-        self._configure_aws_credentials()
 
         try:
-            # Get region
             region = getattr(settings, 'aws_region', None) or os.getenv("AWS_REGION", self.DEFAULT_REGION)
 
-            # Create Bedrock runtime client
-            client = boto3.client("bedrock-runtime", region_name=region)
-
-            # Validate model availability (non-blocking for cross-region models)
-            self._validate_model(model_id)
-
-            # Create ChatBedrock instance
-            llm = ChatBedrock(
-                model_id=model_id,
-                client=client,
-                streaming=streaming,
-                model_kwargs={
-                    "temperature": temperature,
-                    "max_tokens": max_tokens,
-                },
-            )
-
-            # Cache the instance
-            with self._cache_lock:
-                self._llm_cache[cache_key] = llm
-
-            logger.info(f"Bedrock LLM created: {model_id}")
-            return llm
+            # Cached per configuration; hits are a single dict lookup
+            return _build_llm(model_id, temperature, max_tokens, streaming, region)
 
         except NoCredentialsError:
             logger.error("AWS credentials not found")
@@ -172,54 +222,30 @@ class LLMFactory:
             logger.error(f"LLM creation failed: {e}")
             raise LLMFactoryError(f"Failed to create LLM: {e}")
 
-    def _validate_model(self, model_id: str) -> None:
-        """
-        Validate model is accessible.
-
-        Cross-region models (us.anthropic.*, eu.anthropic.*, etc.) skip strict validation
-        since they may not appear in the regional model list.
-        """
-        # Cross-region models skip validation
-        if any(prefix in model_id for prefix in ["us.", "eu.", "ap."]):
-            logger.info(f"Cross-region model: {model_id} (validation skipped)")
-            return
-
-        try:
-            region = getattr(settings, 'aws_region', None) or os.getenv("AWS_REGION", self.DEFAULT_REGION)
-            client = boto3.client("bedrock", region_name=region)
-            response = client.list_foundation_models(byProvider="anthropic")
-            available = [m["modelId"] for m in response.get("modelSummaries", [])]
-
-            if model_id not in available:
-                logger.warning(
-                    f"Model {model_id} not in available list. "
-                    f"Ensure it's enabled in AWS Console → Bedrock → Model access"
-                )
-
-        except ClientError as e:
-            if "AccessDenied" in str(e):
-                logger.debug("Cannot list models (AccessDenied) - assuming model available")
-            else:
-                raise
-
-    def get_provider_info(self) -> str:
-        """Get current LLM provider information."""
+    def _resolve_provider_info(self) -> str:
+        """Resolve the provider description from settings/environment."""
         model_id = (
             getattr(settings, 'bedrock_model_id', None) or
             os.getenv("BEDROCK_MODEL_ID", self.DEFAULT_MODEL)
         )
         return f"AWS Bedrock ({model_id})"
 
+    def get_provider_info(self) -> str:
+        """Get current LLM provider information (resolved once, refreshed by clear_cache)."""
+        return self._provider_info
+
     def get_current_provider(self) -> str:
         """Alias for get_provider_info() for backward compatibility."""
         return self.get_provider_info()
 
     def clear_cache(self) -> None:
         """Clear LLM instance cache."""
-        with self._cache_lock:
-            self._llm_cache.clear()
+        _build_llm.cache_clear()
+        self._provider_info = self._resolve_provider_info()
         logger.info("LLM cache cleared")
 
 
-# Global singleton instance
-llm_factory = LLMFactory()
+@lru_cache(maxsize=1)
+def get_llm_factory() -> LLMFactory:
+    """Return the shared LLMFactory, creating it on first use."""
+    return LLMFactory()
@@ -0,0 +1,114 @@
+"""
+SMTP Connection Pool
+====================
+Small pool of long-lived, authenticated SMTP connections.
+
+Opening an SMTP session costs a TCP connect, a TLS handshake and AUTH on
+every message. Reusing warm connections leaves only the DATA exchange per
+send. Connections are opened lazily up to ``size``, recycled after
+``recycle_seconds`` and transparently reopened if the server dropped them.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from email.message import Message
+from typing import List
+
+import aiosmtplib
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledConnection:
+    client: aiosmtplib.SMTP
+    opened_at: float
+
+
+class SMTPConnectionPool:
+    """
+    Pool of reusable SMTP connections.
+
+    Features:
+    - Lazy connection creation up to the pool size
+    - Age-based recycling of stale sockets
+    - One reconnect-and-retry when the server has closed a connection
+    """
+
+    def __init__(self, size: int = None, recycle_seconds: float = None):
+        self.size = size or settings.smtp_pool_size
+        self.recycle_seconds = recycle_seconds or settings.smtp_pool_recycle
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.size)
+
+    async def _connect(self) -> _PooledConnection:
+        client = aiosmtplib.SMTP(
+            hostname=settings.mail_server,
+            port=settings.mail_port,
+            use_tls=settings.mail_ssl_tls,
+            start_tls=settings.mail_starttls,
+        )
+        await client.connect()
+        await client.login(settings.mail_username, settings.mail_password)
+        logger.debug(f"Opened SMTP connection to {settings.mail_server}")
+        return _PooledConnection(client, asyncio.get_running_loop().time())
+
+    @staticmethod
+    async def _close(conn: _PooledConnection) -> None:
+        try:
+            await conn.client.quit()
+        except Exception:
+            conn.client.close()
+
+    async def _acquire(self) -> _PooledConnection:
+        await self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                return await self._connect()
+
+            age = asyncio.get_running_loop().time() - conn.opened_at
+            if age > self.recycle_seconds or not conn.client.is_connected:
+                await self._close(conn)
+                return await self._connect()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn: _PooledConnection) -> None:
+        self._idle.put_nowait(conn)
+        self._slots.release()
+
+    async def send_message(self, message: Message) -> None:
+        """
+        Send a message over a pooled connection.
+
+        Args:
+            message: Fully built email message
+        """
+        conn = await self._acquire()
+        try:
+            try:
+                await conn.client.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                # Server closed an idle connection; drop its socket, reopen once and retry
+                conn.client.close()
+                conn = await self._connect()
+                await conn.client.send_message(message)
+        except Exception:
+            await self._close(conn)
+            self._slots.release()
+            raise
+        self._release(conn)
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        conns: List[_PooledConnection] = []
+        while not self._idle.empty():
+            conns.append(self._idle.get_nowait())
+        await asyncio.gather(*(self._close(conn) for conn in conns))
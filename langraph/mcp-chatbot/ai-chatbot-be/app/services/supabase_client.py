@@ -5,14 +5,9 @@ This module provides backwards compatibility by exporting db_client as supabase_
 from pathlib import Path
 from app.database.crud import db_client
 
-from app.repositories.supabase_document import supabase_document_repository
-
 # Export the database client as supabase_client for backwards compatibility
 supabase_client = db_client
 
-# Global storage client instance pointing to Supabase
-storage_client = supabase_document_repository
-
 
 def get_authenticated_client(access_token: str):
     """
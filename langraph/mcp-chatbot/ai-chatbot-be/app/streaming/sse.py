@@ -26,15 +26,29 @@ Usage:
 """
 
 import asyncio
-import time
 import logging
 from typing import AsyncIterator, Dict, Any, Optional, Literal
 from enum import Enum
 from datetime import datetime
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+def _utc_timestamp() -> str:
+    """Current UTC time in the ISO-8601 form used by event timestamps."""
+    return datetime.utcnow().isoformat() + "Z"
+
+
+# SSE framing, kept as bytes so frames are never re-encoded on the way out
+_SSE_DATA_PREFIX = b"data: "
+_SSE_FRAME_END = b"\n\n"
+_SSE_HEARTBEAT = b": heartbeat\n\n"
+
+
+# Tokens that end a sentence and flush the token buffer immediately
+_FLUSH_CHARS = frozenset({".", "!", "?", "\n"})
+
 
 class StreamEventType(str, Enum):
     """Types of streaming events."""
@@ -65,16 +79,24 @@ class StreamEvent(BaseModel):
     """
     type: StreamEventType
     data: Dict[str, Any] | str | None = None
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    # Filled in at serialization time unless the caller supplies one
+    timestamp: Optional[str] = None
 
-    def to_sse(self) -> str:
+    def to_sse(self) -> bytes:
         """
         Convert to Server-Sent Events wire format.
 
+        Serialized with orjson rather than ``model_dump_json`` since this runs
+        once per streamed event; the JSON shape is unchanged.
+
         Returns:
-            SSE-formatted string: "data: {json}\n\n"
+            UTF-8 SSE frame: b"data: {json}\n\n"
         """
-        return f"data: {self.model_dump_json()}\n\n"
+        payload = orjson.dumps(
+            {"type": self.type, "data": self.data, "timestamp": self.timestamp or _utc_timestamp()},
+            default=str,
+        )
+        return _SSE_DATA_PREFIX + payload + _SSE_FRAME_END
 
 
 class TokenEvent(StreamEvent):
@@ -83,6 +105,30 @@ class TokenEvent(StreamEvent):
     data: str  # The actual token/text chunk
 
 
+class TokenChunk:
+    """
+    Lightweight token frame for the streaming hot path.
+
+    Produces the same wire format as ``TokenEvent`` without constructing and
+    validating a Pydantic model per token; the JSON envelope is a fixed
+    template so only the text itself is encoded.
+    """
+    __slots__ = ("data", "timestamp")
+
+    type = StreamEventType.TOKEN
+
+    _PREFIX = b'data: {"type":"token","data":'
+    _SUFFIX = b',"timestamp":"%s"}\n\n'
+
+    def __init__(self, data: str, timestamp: Optional[str] = None):
+        self.data = data
+        self.timestamp = timestamp or _utc_timestamp()
+
+    def to_sse(self) -> bytes:
+        """Convert to Server-Sent Events wire format."""
+        return self._PREFIX + orjson.dumps(self.data) + self._SUFFIX % self.timestamp.encode()
+
+
 class StatusEvent(StreamEvent):
     """Status update event - pipeline state changes."""
     type: Literal[StreamEventType.STATUS] = StreamEventType.STATUS
@@ -174,7 +220,7 @@ class StreamingManager:
         self,
         stream_generator: AsyncIterator[str],
         send_heartbeat: bool = True
-    ) -> AsyncIterator[StreamEvent]:
+    ) -> AsyncIterator[StreamEvent | TokenChunk]:
         """
         Wrap a stream generator with timeout and heartbeat support.
 
@@ -183,7 +229,7 @@ class StreamingManager:
             send_heartbeat: Whether to send periodic heartbeat/progress events
 
         Yields:
-            StreamEvent objects for SSE encoding
+            StreamEvent objects for SSE encoding (TokenChunk for tokens)
 
         Contract:
         - Yields TOKEN events for text chunks
@@ -191,19 +237,47 @@ class StreamingManager:
         - Yields ERROR event on timeout or error (terminates stream)
         - Never raises exceptions - errors become ERROR events
         """
-        self._start_time = time.time()
+        # Monotonic loop clock for timing; the wall clock is read only once per
+        # heartbeat window and that stamp is shared by the window's tokens
+        loop = asyncio.get_running_loop()
+        self._start_time = loop.time()
         self._last_heartbeat = self._start_time
         self._last_disconnect_check = self._start_time
         self._tokens_sent = 0
         self._cancelled = False
 
-        buffer = ""
+        buffer_parts: list[str] = []
+        buffer_len = 0
+        window_timestamp = _utc_timestamp()
+
+        # Loop-invariant settings bound to locals for the per-token path
+        start_time = self._start_time
+        timeout = self.timeout
+        buffer_size = self.buffer_size
+        heartbeat_interval = self.heartbeat_interval
 
         # Per-token timeout to prevent hanging (max 60s between tokens)
-        per_token_timeout = min(60.0, self.timeout / 10)
+        per_token_timeout = min(60.0, timeout / 10)
+        deadline = start_time + timeout
+        token_iterator = stream_generator.__aiter__()
 
         try:
-            async for token in stream_generator:
+            while True:
+                try:
+                    token = await asyncio.wait_for(
+                        token_iterator.__anext__(), timeout=per_token_timeout
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    yield ErrorEvent(data={
+                        "message": f"No token received for {per_token_timeout}s",
+                        "code": "TOKEN_TIMEOUT",
+                        "recoverable": False,
+                        "tokens_sent": self._tokens_sent
+                    })
+                    break
+
                 # Check if cancelled (client disconnected)
                 if self._cancelled:
                     yield ErrorEvent(data={
@@ -214,38 +288,40 @@ class StreamingManager:
                     break
 
                 # Check total timeout
-                elapsed = time.time() - self._start_time
-                if elapsed > self.timeout:
+                current_time = loop.time()
+                if current_time > deadline:
                     yield ErrorEvent(data={
-                        "message": f"Streaming timeout after {self.timeout}s",
+                        "message": f"Streaming timeout after {timeout}s",
                         "code": "STREAMING_TIMEOUT",
                         "recoverable": False
                     })
                     break
 
                 # Buffer tokens
-                buffer += token
+                buffer_parts.append(token)
+                buffer_len += len(token)
                 self._tokens_sent += 1
 
                 # Send buffered tokens when buffer is full or at sentence boundaries
-                if len(buffer) >= self.buffer_size or token in [".", "!", "?", "\n"]:
-                    yield TokenEvent(data=buffer)
-                    buffer = ""
-
-                # Send heartbeat/progress if needed
-                if send_heartbeat:
-                    current_time = time.time()
-                    if current_time - self._last_heartbeat >= self.heartbeat_interval:
+                if buffer_len >= buffer_size or token in _FLUSH_CHARS:
+                    yield TokenChunk("".join(buffer_parts), window_timestamp)
+                    buffer_parts.clear()
+                    buffer_len = 0
+
+                # Start a new timestamp window and send heartbeat/progress if needed
+                if current_time - self._last_heartbeat >= heartbeat_interval:
+                    window_timestamp = _utc_timestamp()
+                    if send_heartbeat:
                         yield ProgressEvent(data={
                             "tokens": self._tokens_sent,
-                            "time": round(current_time - self._start_time, 2),
-                            "estimated_remaining": self._estimate_remaining_time()
-                        })
-                        self._last_heartbeat = current_time
+                            "time": round(current_time - start_time, 2),
+                            "estimated_remaining": self._estimate_remaining_time(current_time)
+                        }, timestamp=window_timestamp)
+                    self._last_heartbeat = current_time
 
             # Send any remaining buffered content
-            if buffer:
-                yield TokenEvent(data=buffer)
+            if buffer_parts:
+                yield TokenChunk("".join(buffer_parts), window_timestamp)
 
         except asyncio.TimeoutError:
             yield ErrorEvent(data={
@@ -272,17 +348,20 @@ class StreamingManager:
                 "tokens_sent": self._tokens_sent
             })
 
-    def _estimate_remaining_time(self) -> float:
+    def _estimate_remaining_time(self, now: float) -> float:
         """
         Estimate remaining time based on token generation rate.
 
+        Args:
+            now: Current loop time, on the same clock as ``_start_time``
+
         Returns:
             Estimated seconds remaining (0.0 if cannot estimate)
         """
         if self._tokens_sent == 0:
             return 0.0
 
-        elapsed = time.time() - self._start_time
+        elapsed = now - self._start_time
         avg_time_per_token = elapsed / self._tokens_sent
 
         # Conservative estimate of total tokens (assume 2x current, max 500)
@@ -295,7 +374,7 @@ class StreamingManager:
 async def create_sse_stream(
     events: AsyncIterator[StreamEvent],
     include_heartbeat: bool = True
-) -> AsyncIterator[str]:
+) -> AsyncIterator[bytes]:
     """
     Convert stream events to SSE format with optional keepalive.
 
@@ -304,9 +383,10 @@ async def create_sse_stream(
         include_heartbeat: Whether to include SSE comment heartbeats
 
     Yields:
-        SSE-formatted strings
+        UTF-8 encoded SSE frames
     """
-    last_heartbeat = time.time()
+    loop = asyncio.get_running_loop()
+    last_heartbeat = loop.time()
     heartbeat_interval = 15.0  # SSE comment heartbeat every 15s
 
     try:
@@ -316,9 +396,9 @@ async def create_sse_stream(
 
             # Send SSE comment heartbeat to keep connection alive
             if include_heartbeat:
-                current_time = time.time()
+                current_time = loop.time()
                 if current_time - last_heartbeat >= heartbeat_interval:
-                    yield ": heartbeat\n\n"
+                    yield _SSE_HEARTBEAT
                     last_heartbeat = current_time
 
     except asyncio.CancelledError:
@@ -339,16 +419,16 @@ async def create_sse_stream(
         }).to_sse()
 
 
-def create_error_stream(error_message: str, error_code: str = "ERROR") -> str:
+def create_error_stream(error_message: str, error_code: str = "ERROR") -> bytes:
     """
-    Create an SSE error event string.
+    Create an SSE error event frame.
 
     Args:
         error_message: Error message to include
         error_code: Error code for categorization
 
     Returns:
-        SSE-formatted error event string
+        UTF-8 encoded SSE error frame
     """
     event = ErrorEvent(data={
         "message": error_message,
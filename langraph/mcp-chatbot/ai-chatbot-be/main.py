@@ -6,48 +6,41 @@ Enterprise-grade document chatbot API with health checks and graceful shutdown.
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 import logging
-import signal
+import os
 import sys
 from contextlib import asynccontextmanager
 
-from app.api.routes import auth, documents, chat, google_auth, streaming_chat
 from app.health import routes as health
-from app.core.middleware import LoggingMiddleware, RequestIDMiddleware
+from app.core.middleware import LoggingMiddleware, RequestIDMiddleware, StreamAwareGZipMiddleware
 from app.core.config import settings
+from app.api.routes import auth, documents, chat, google_auth, streaming_chat
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Graceful shutdown flag
-shutdown_event = False
-
-
-def signal_handler(signum, frame):
-    """Handle shutdown signals gracefully."""
-    global shutdown_event
-    logger.info(f"Received signal {signum}, initiating graceful shutdown...")
-    shutdown_event = True
-
-
-# Register signal handlers
-signal.signal(signal.SIGTERM, signal_handler)
-signal.signal(signal.SIGINT, signal_handler)
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
+
+    Uvicorn owns SIGTERM/SIGINT and runs the shutdown half of this context
+    when it receives them.
     
     Startup:
     - Log application start
     - Validate configuration
     - Initialize connections
+    - Start the coalescing DB writer
+    - Start email workers
     
     Shutdown:
+    - Send queued emails
+    - Flush the coalescing DB writer
+    - Close storage HTTP client
     - Close database connections
     - Flush logs
     - Clean up resources
@@ -56,25 +49,43 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting Document Chatbot API v2.0.0 in {settings.environment} mode")
     logger.info(f"Debug mode: {settings.debug}")
     logger.info(f"Log level: {settings.log_level}")
+    # Services with connections or workers are imported here, not at module
+    # import, so importing ``main`` doesn't open engines or pools
+    from app.database.connection import engine
+    from app.repositories.supabase_document import get_supabase_document_repository
+    from app.services.db_writer import db_writer
+    from app.services.email_service import email_service
+
+    db_writer.start()
+    await email_service.start_workers()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Document Chatbot API...")
+    await email_service.stop_workers()
+    await db_writer.stop()
+    if get_supabase_document_repository.cache_info().currsize:
+        await get_supabase_document_repository().close()
     logger.info("Closing database connections...")
+    engine.dispose()
     logger.info("Shutdown complete")
+    for handler in logging.getLogger().handlers:
+        handler.flush()
 
 
 app = FastAPI(
     title="Document Chatbot API",
     description="Enterprise RAG system with advanced retrieval and streaming",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add middleware
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(RequestIDMiddleware)
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024)
 
 # Configure CORS from settings
 app.add_middleware(
@@ -85,7 +96,7 @@ app.add_middleware(
     allow_headers=settings.allowed_headers,
 )
 
-# Include routers
+# Include routers once; heavy services behind them are built on first use
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
@@ -107,10 +118,16 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    logger.info("Starting Document Chatbot API server")
+
+    # WEB_CONCURRENCY overrides the worker count (default: 2 * cores + 1)
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+    logger.info(f"Starting Document Chatbot API server with {workers} workers")
     uvicorn.run(
-        app,
+        "main:app",  # Import string is required for multiple workers
         host="0.0.0.0",
         port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
         log_level=settings.log_level.lower()
     )
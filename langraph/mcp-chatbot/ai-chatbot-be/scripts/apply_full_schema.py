@@ -4,6 +4,11 @@ Apply Full Production Schema to Supabase
 This script reads the production-optimized schema.sql and applies it to
 the Supabase database defined in DATABASE_URL.
 
+The script is split into statements and applied in three phases: tables
+and other base DDL in one transaction, CREATE INDEX CONCURRENTLY in
+parallel (one connection per table), then functions, triggers, views,
+policies and comments in a second transaction.
+
 Enterprise Features:
 - HNSW Vector Indexes
 - Analytics & Monitoring Tables
@@ -12,12 +17,14 @@ Enterprise Features:
 - Automated Triggers
 """
 
+import asyncio
 import os
+import re
 import sys
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+import asyncpg
 
 # Configure logging
 logging.basicConfig(
@@ -29,16 +36,328 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-def apply_schema():
+_INDEX_RE = re.compile(r"^CREATE\s+(UNIQUE\s+)?INDEX\s+(?!CONCURRENTLY\b)", re.IGNORECASE)
+_INDEX_TABLE_RE = re.compile(r"\bON\s+(?:ONLY\s+)?([\w.\"]+)", re.IGNORECASE)
+_INDEX_NAME_RE = re.compile(
+    r"\bINDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.\"]+)\s+ON\b", re.IGNORECASE
+)
+# Objects created after the indexes: they may reference indexes or each other
+_POST_INDEX_RE = re.compile(
+    r"^(CREATE\s+(OR\s+REPLACE\s+)?(FUNCTION|TRIGGER|VIEW|POLICY)|DROP\s+TRIGGER|COMMENT\s+ON)\b",
+    re.IGNORECASE,
+)
+_DOLLAR_TAG_RE = re.compile(r"\$(?:[A-Za-z_]\w*)?\$")
+
+# duplicate_table (also indexes), duplicate_object, duplicate_function, duplicate_schema
+_ALREADY_EXISTS_SQLSTATES = {"42P07", "42710", "42723", "42P06"}
+# undefined_column, generated_always: the legacy column to map from isn't there
+# or the target is a generated column, so the backfill has nothing to do
+_NOTHING_TO_BACKFILL_SQLSTATES = {"42703", "428C9"}
+
+# Tracks one-time data backfills so they don't rescan tables on every deploy
+_MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS migrations (
+        name VARCHAR(255) PRIMARY KEY,
+        applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+async def fetch_existing_columns(conn, tables):
+    """Return the set of (table, column) pairs already present in the public schema."""
+    rows = await conn.fetch(
+        """
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = ANY($1::text[])
+        """,
+        list(tables),
+    )
+    return {(row["table_name"], row["column_name"]) for row in rows}
+
+
+async def add_columns_if_missing(conn, table, column_defs, existing):
+    """
+    Add the columns not in ``existing``, batching them into one ALTER TABLE.
+
+    Runs inside the caller's transaction; each statement gets its own
+    SAVEPOINT so a failed ALTER doesn't abort the rest of the migration.
+    """
+    # Skip columns that already exist so a migrated database issues no DDL at all
+    column_defs = {
+        col_name: col_type
+        for col_name, col_type in column_defs.items()
+        if (table, col_name) not in existing
+    }
+    if not column_defs:
+        return
+
+    logger.info(f"Adding {len(column_defs)} missing column(s) to {table}: {', '.join(column_defs)}")
+
+    # One ALTER TABLE with all clauses: a single round trip per table
+    clauses = ", ".join(
+        f"ADD COLUMN IF NOT EXISTS {col_name} {col_type}"
+        for col_name, col_type in column_defs.items()
+    )
+    try:
+        async with conn.transaction():
+            await conn.execute(f"ALTER TABLE {table} {clauses};")
+        return
+    except Exception as e:
+        logger.warning(f"Batched ALTER on {table} failed, retrying per column: {e}")
+
+    # Fall back to one column at a time so the others still get added
+    for col_name, col_type in column_defs.items():
+        try:
+            async with conn.transaction():
+                await conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {col_name} {col_type};")
+        except Exception as e:
+            logger.warning(f"Could not add {col_name} to {table}: {e}")
+
+
+def split_sql_statements(script):
+    """
+    Split a SQL script into statements on ``;``.
+
+    Semicolons inside quoted strings, quoted identifiers, comments and
+    ``$tag$ ... $tag$`` dollar-quoted bodies don't end a statement.
+    Comments are dropped from the output.
+    """
+    statements = []
+    current = []
+    i, n = 0, len(script)
+    while i < n:
+        ch = script[i]
+        if script.startswith("--", i):
+            end = script.find("\n", i)
+            i = n if end == -1 else end
+        elif script.startswith("/*", i):
+            end = script.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            current.append(" ")
+        elif ch in ("'", '"'):
+            j = i + 1
+            while j < n:
+                if script[j] == ch:
+                    if script[j + 1:j + 2] == ch:  # doubled quote escape
+                        j += 2
+                        continue
+                    break
+                if ch == "'" and script[j] == "\\" and script[i - 1:i] in ("E", "e"):
+                    j += 1
+                j += 1
+            current.append(script[i:j + 1])
+            i = j + 1
+        elif ch == "$" and (match := _DOLLAR_TAG_RE.match(script, i)):
+            tag = match.group(0)
+            end = script.find(tag, match.end())
+            end = n if end == -1 else end + len(tag)
+            current.append(script[i:end])
+            i = end
+        elif ch == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+        else:
+            current.append(ch)
+            i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _is_already_exists(error):
+    return getattr(error, "sqlstate", None) in _ALREADY_EXISTS_SQLSTATES
+
+
+async def run_in_transaction(conn, statements):
+    """Run statements in one transaction, each in a SAVEPOINT; skip ones that already exist."""
+    async with conn.transaction():
+        for statement in statements:
+            try:
+                async with conn.transaction():
+                    await conn.execute(statement)
+            except asyncpg.PostgresError as e:
+                if not _is_already_exists(e):
+                    raise
+                logger.debug(f"Skipping existing object: {e}")
+
+
+async def drop_invalid_index(conn, name):
+    """
+    Drop ``name`` if a failed concurrent build left it INVALID.
+
+    ``IF NOT EXISTS`` would otherwise skip the broken index on every run.
+    Returns whether an index was dropped.
+    """
+    invalid = await conn.fetchval(
+        "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1::text)",
+        name,
+    )
+    if not invalid:
+        return False
+    logger.warning(f"Dropping invalid index {name} left by a failed build")
+    await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+    return True
+
+
+async def create_indexes_concurrently(pool, statements):
+    """
+    Build indexes with CREATE INDEX CONCURRENTLY, one connection per table.
+
+    CONCURRENTLY can't run inside a transaction, so each statement autocommits.
+    Builds on the same table conflict with each other, so a table's indexes
+    run in sequence while different tables build in parallel. A failed
+    build leaves an INVALID index behind; it is dropped and rebuilt once.
+    """
+    by_table = {}
+    for statement in statements:
+        match = _INDEX_TABLE_RE.search(statement)
+        table = match.group(1) if match else statement
+        by_table.setdefault(table, []).append(_INDEX_RE.sub(
+            lambda m: f"CREATE {m.group(1) or ''}INDEX CONCURRENTLY ", statement, count=1
+        ))
+
+    async def build(table, table_statements):
+        async with pool.acquire() as conn:
+            for statement in table_statements:
+                match = _INDEX_NAME_RE.search(statement)
+                name = match.group(1) if match else None
+                if name:
+                    # Clear leftovers from an earlier run before IF NOT EXISTS hides them
+                    await drop_invalid_index(conn, name)
+                try:
+                    await conn.execute(statement)
+                except asyncpg.PostgresError as e:
+                    if _is_already_exists(e):
+                        logger.debug(f"Skipping existing index on {table}: {e}")
+                    elif name and await drop_invalid_index(conn, name):
+                        logger.warning(f"Retrying build of {name} after failure: {e}")
+                        await conn.execute(statement)
+                    else:
+                        raise
+
+    results = await asyncio.gather(
+        *(build(table, table_statements) for table, table_statements in by_table.items()),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors:
+        logger.error(f"Index build failed: {error}")
+    if errors:
+        raise errors[0]
+    logger.info(f"Built {len(statements)} indexes across {len(by_table)} tables")
+
+
+async def apply_schema_script(pool, sql_script):
+    """Apply schema.sql: base DDL, then indexes in parallel, then dependent objects."""
+    base, indexes, post = [], [], []
+    for statement in split_sql_statements(sql_script):
+        if _INDEX_RE.match(statement):
+            indexes.append(statement)
+        elif _POST_INDEX_RE.match(statement):
+            post.append(statement)
+        else:
+            base.append(statement)
+
+    async with pool.acquire() as conn:
+        await run_in_transaction(conn, base)
+
+    await create_indexes_concurrently(pool, indexes)
+
+    async with pool.acquire() as conn:
+        await run_in_transaction(conn, post)
+
+
+async def run_backfill_once(pool, name, sql):
+    """
+    Run a data backfill the first time only, recorded in the migrations table.
+
+    The sentinel row and the UPDATE commit together, so a failed backfill is
+    retried on the next run.
+    """
+    try:
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                claimed = await conn.fetchval(
+                    "INSERT INTO migrations (name) VALUES ($1) ON CONFLICT (name) DO NOTHING RETURNING name",
+                    name,
+                )
+                if not claimed:
+                    logger.debug(f"Backfill {name} already applied, skipping")
+                    return
+                try:
+                    async with conn.transaction():
+                        await conn.execute(sql)
+                except asyncpg.PostgresError as e:
+                    if getattr(e, "sqlstate", None) not in _NOTHING_TO_BACKFILL_SQLSTATES:
+                        raise
+                    logger.info(f"Backfill {name} not needed: {e}")
+                    return
+        logger.info(f"Backfill {name} applied")
+    except Exception as e:
+        logger.warning(f"Backfill {name} failed, will retry next run: {e}")
+
+
+async def map_response_time(pool):
+    """Map old 'response_time' (NUMERIC(5,3)) to 'total_response_time_ms' if possible."""
+    # Only needed where total_response_time_ms predates the generated column
+    await run_backfill_once(
+        pool,
+        "chat_history_ms_backfill",
+        "UPDATE chat_history SET total_response_time_ms = CAST(response_time * 1000 AS INTEGER) WHERE total_response_time_ms IS NULL AND response_time IS NOT NULL;",
+    )
+
+
+async def map_processing_status(pool):
+    """Map old 'processed' boolean to 'processing_status'."""
+    await run_backfill_once(
+        pool,
+        "documents_processing_status_backfill",
+        """
+            UPDATE documents
+            SET processing_status = CASE WHEN processed THEN 'completed' ELSE 'failed' END
+            WHERE processed = true OR (processed = false AND error IS NOT NULL);
+        """,
+    )
+
+
+async def verify_tables(pool):
+    """Log the public tables and warn if any production tables are missing."""
+    logger.info("Verifying tables...")
+    rows = await pool.fetch("""
+        SELECT table_name 
+        FROM information_schema.tables 
+        WHERE table_schema = 'public' 
+        AND table_type = 'BASE TABLE'
+        ORDER BY table_name;
+    """)
+    tables = [row[0] for row in rows]
+    logger.info(f"Existing tables in public schema: {', '.join(tables)}")
+
+    # Check for key new tables
+    critical_tables = ['query_cache', 'daily_analytics', 'system_health_logs']
+    missing = [t for t in critical_tables if t not in tables]
+    if missing:
+        logger.warning(f"Some production tables seem to be missing: {', '.join(missing)}")
+    else:
+        logger.info("✓ All production-optimized tables verified!")
+
+
+async def apply_schema():
     # 1. Get database URL
     db_url = os.getenv('DATABASE_URL')
     if not db_url:
         logger.error("DATABASE_URL not found in environment variables!")
         sys.exit(1)
 
-    # 2. Fix driver prefix for SQLAlchemy if needed
-    if db_url.startswith('postgresql://'):
-        db_url = db_url.replace('postgresql://', 'postgresql+psycopg2://')
+    # 2. asyncpg takes a plain libpq DSN: strip any SQLAlchemy driver suffix
+    if db_url.startswith('postgresql+'):
+        db_url = 'postgresql://' + db_url.split('://', 1)[1]
 
     # 3. Locate schema.sql
     base_dir = Path(__file__).parent.parent
@@ -54,131 +373,106 @@ def apply_schema():
 
     # 4. Connect and Execute
     logger.info("Connecting to Supabase...")
-    engine = create_engine(db_url, pool_pre_ping=True)
-    
     try:
-        with engine.connect() as conn:
-            # 5. Pre-migration: Add missing columns to existing tables if needed
-            logger.info("Pre-migration check: Ensuring columns exist for critical tables...")
-            
-            # Helper to add columns if they don't exist
-            def add_columns_if_missing(table, column_defs):
-                for col_name, col_type in column_defs.items():
-                    try:
-                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {col_name} {col_type};"))
-                        conn.commit()
-                    except Exception as e:
-                        logger.warning(f"Could not add {col_name} to {table}: {e}")
-
-            # Define missing columns for 'users'
-            users_cols = {
-                "role": "VARCHAR(50) DEFAULT 'user'",
-                "plan_type": "VARCHAR(50) DEFAULT 'free'",
-                "storage_limit_mb": "INTEGER DEFAULT 100",
-                "monthly_query_limit": "INTEGER DEFAULT 1000",
-                "current_month_queries": "INTEGER DEFAULT 0",
-                "last_login_at": "TIMESTAMP WITH TIME ZONE",
-                "updated_at": "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"
-            }
-            add_columns_if_missing("users", users_cols)
-
-            # Define missing columns for 'documents'
-            docs_cols = {
-                "file_size_bytes": "BIGINT DEFAULT 0",
-                "processing_status": "VARCHAR(50) DEFAULT 'pending'",
-                "processing_started_at": "TIMESTAMP WITH TIME ZONE",
-                "processing_completed_at": "TIMESTAMP WITH TIME ZONE",
-                "error_message": "TEXT",
-                "page_count": "INTEGER",
-                "word_count": "INTEGER",
-                "language": "VARCHAR(10)",
-                "document_hash": "VARCHAR(64)",
-                "quality_score": "DECIMAL(3,2) DEFAULT 1.0",
-                "embedding_count": "INTEGER DEFAULT 0",
-                "updated_at": "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"
-            }
-            add_columns_if_missing("documents", docs_cols)
-
-            # Define missing columns for 'document_embeddings'
-            embeddings_cols = {
-                "content_preview": "VARCHAR(500)",
-                "content_vector": "TSVECTOR",
-                "retrieval_count": "INTEGER DEFAULT 0",
-                "avg_retrieval_score": "DECIMAL(4,3) DEFAULT 0.0",
-                "last_retrieved_at": "TIMESTAMP WITH TIME ZONE",
-                "metadata": "JSONB DEFAULT '{}'",
-                "page_number": "INTEGER",
-                "word_count": "INTEGER"
-            }
-            add_columns_if_missing("document_embeddings", embeddings_cols)
-
-            # Define missing columns for 'chat_history'
-            chat_cols = {
-                "session_id": "UUID",
-                "total_response_time_ms": "INTEGER",
-                "retrieval_time_ms": "INTEGER",
-                "generation_time_ms": "INTEGER",
-                "confidence_score": "DECIMAL(3,2) DEFAULT 0.0",
-                "sources_used": "INTEGER DEFAULT 0",
-                "provider_model": "VARCHAR(100)",
-                "updated_at": "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"
-            }
-            add_columns_if_missing("chat_history", chat_cols)
-
-            # Map old 'response_time' (NUMERIC(5,3)) to 'total_response_time_ms' if possible
-            try:
-                conn.execute(text("UPDATE chat_history SET total_response_time_ms = CAST(response_time * 1000 AS INTEGER) WHERE total_response_time_ms IS NULL AND response_time IS NOT NULL;"))
-                conn.commit()
-            except Exception:
-                pass
+        # statement_cache_size=0: safe behind Supabase's transaction-mode pooler
+        pool = await asyncpg.create_pool(db_url, min_size=4, max_size=10, statement_cache_size=0)
+    except Exception as e:
+        logger.critical(f"Critical error during migration: {str(e)}")
+        sys.exit(1)
 
-            # Map old 'processed' boolean to 'processing_status'
-            try:
-                conn.execute(text("UPDATE documents SET processing_status = 'completed' WHERE processed = true;"))
-                conn.execute(text("UPDATE documents SET processing_status = 'failed' WHERE processed = false AND error IS NOT NULL;"))
-                conn.commit()
-            except Exception:
-                pass
-
-            logger.info("Applying full schema (this may take a few moments)...")
-            
-            # Use raw connection to execute the multi-statement script
-            raw_conn = engine.raw_connection()
-            try:
-                cursor = raw_conn.cursor()
-                cursor.execute(sql_script)
-                raw_conn.commit()
-                logger.info("✓ Full schema applied successfully!")
-            except Exception as e:
-                raw_conn.rollback()
-                logger.error(f"Failed to apply schema: {str(e)}")
-                raise
-            finally:
-                raw_conn.close()
-
-            # 5. Verify tables
-            logger.info("Verifying tables...")
-            result = conn.execute(text("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_type = 'BASE TABLE'
-                ORDER BY table_name;
-            """))
-            tables = [row[0] for row in result]
-            logger.info(f"Existing tables in public schema: {', '.join(tables)}")
-            
-            # Check for key new tables
-            critical_tables = ['query_cache', 'daily_analytics', 'system_health_logs']
-            missing = [t for t in critical_tables if t not in tables]
-            if missing:
-                logger.warning(f"Some production tables seem to be missing: {', '.join(missing)}")
-            else:
-                logger.info("✓ All production-optimized tables verified!")
+    try:
+        # 5. Pre-migration: Add missing columns to existing tables if needed
+        logger.info("Pre-migration check: Ensuring columns exist for critical tables...")
+
+        # Define missing columns for 'users'
+        users_cols = {
+            "role": "VARCHAR(50) DEFAULT 'user'",
+            "plan_type": "VARCHAR(50) DEFAULT 'free'",
+            "storage_limit_mb": "INTEGER DEFAULT 100",
+            "monthly_query_limit": "INTEGER DEFAULT 1000",
+            "current_month_queries": "INTEGER DEFAULT 0",
+            "last_login_at": "TIMESTAMP WITH TIME ZONE",
+            "updated_at": "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"
+        }
+
+        # Define missing columns for 'documents'
+        docs_cols = {
+            "file_size_bytes": "BIGINT DEFAULT 0",
+            "processing_status": "VARCHAR(50) DEFAULT 'pending'",
+            "processing_started_at": "TIMESTAMP WITH TIME ZONE",
+            "processing_completed_at": "TIMESTAMP WITH TIME ZONE",
+            "error_message": "TEXT",
+            "page_count": "INTEGER",
+            "word_count": "INTEGER",
+            "language": "VARCHAR(10)",
+            "document_hash": "VARCHAR(64)",
+            "quality_score": "DECIMAL(3,2) DEFAULT 1.0",
+            "embedding_count": "INTEGER DEFAULT 0",
+            "updated_at": "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"
+        }
+
+        # Define missing columns for 'document_embeddings'
+        embeddings_cols = {
+            "content_preview": "VARCHAR(500)",
+            "content_vector": "TSVECTOR",
+            "retrieval_count": "INTEGER DEFAULT 0",
+            "avg_retrieval_score": "DECIMAL(4,3) DEFAULT 0.0",
+            "last_retrieved_at": "TIMESTAMP WITH TIME ZONE",
+            "metadata": "JSONB DEFAULT '{}'",
+            "page_number": "INTEGER",
+            "word_count": "INTEGER"
+        }
+
+        # Define missing columns for 'chat_history'
+        chat_cols = {
+            "session_id": "UUID",
+            # Derived from the legacy response_time (seconds) that the app still writes
+            "total_response_time_ms": "INTEGER GENERATED ALWAYS AS (CAST(response_time * 1000 AS INTEGER)) STORED",
+            "retrieval_time_ms": "INTEGER",
+            "generation_time_ms": "INTEGER",
+            "confidence_score": "DECIMAL(3,2) DEFAULT 0.0",
+            "sources_used": "INTEGER DEFAULT 0",
+            "provider_model": "VARCHAR(100)",
+            "updated_at": "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"
+        }
+
+        table_columns = {
+            "users": users_cols,
+            "documents": docs_cols,
+            "document_embeddings": embeddings_cols,
+            "chat_history": chat_cols,
+        }
+
+        # DDL stays serial on a single connection and commits once; one catalog
+        # probe decides what to alter
+        async with pool.acquire() as conn:
+            existing = await fetch_existing_columns(conn, table_columns)
+            async with conn.transaction():
+                for table, column_defs in table_columns.items():
+                    await add_columns_if_missing(conn, table, column_defs, existing)
+
+        # The data mappings touch different tables, so run them concurrently
+        # once the new columns are committed; each runs at most once
+        await pool.execute(_MIGRATIONS_TABLE_SQL)
+        await asyncio.gather(map_response_time(pool), map_processing_status(pool))
+
+        logger.info("Applying full schema (this may take a few moments)...")
+
+        try:
+            await apply_schema_script(pool, sql_script)
+            logger.info("✓ Full schema applied successfully!")
+        except Exception as e:
+            logger.error(f"Failed to apply schema: {str(e)}")
+            raise
+
+        # 6. Verify tables
+        await verify_tables(pool)
 
     except Exception as e:
         logger.critical(f"Critical error during migration: {str(e)}")
         sys.exit(1)
+    finally:
+        await pool.close()
 
 if __name__ == "__main__":
-    apply_schema()
+    asyncio.run(apply_schema())
@@ -6,9 +6,10 @@ Migrates the database from 384-dimensional embeddings (all-MiniLM-L6-v2)
 to 768-dimensional embeddings (sentence-transformers/all-mpnet-base-v2).
 
 This script will:
-1. Alter the embedding column to support 768 dimensions
+1. Alter the embedding column to 768-dimensional halfvec (FP16) storage
 2. Clear existing embeddings (they're incompatible with new model)
 3. Re-embed all documents with the new model
+4. Build the HNSW vector index over the loaded embeddings
 
 Usage:
     python scripts/migrate_embeddings.py
@@ -16,23 +17,29 @@ Usage:
 Options:
     --dry-run       Show what would be done without making changes
     --skip-reembed  Only alter column, don't re-embed documents
+    --workers N     Encode with N worker processes (HuggingFace provider only)
 """
 
 import sys
 import os
 import argparse
+import io
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import text
+from sqlalchemy import select, text
 from app.database.connection import SessionLocal, engine
-from app.database.models import Document, DocumentEmbedding
+from app.database.models import DocumentEmbedding
 from app.rag.embeddings.service import get_embeddings_service
 from app.rag.documents.splitter import TextSplitterService
 from app.rag.retrieval.vector_store import get_vector_store
+from scripts.pg_binary_copy import COPY_HEADER, COPY_TRAILER, copy_rows
 
 # Setup logging
 logging.basicConfig(
@@ -41,6 +48,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Chunks embedded per model call / committed per transaction
+REEMBED_BATCH_SIZE = 256
+# Unlogged staging table the new embeddings are COPYed into before one UPDATE
+STAGING_TABLE = "tmp_emb"
 
 def check_current_dimension():
     """Check the current embedding column dimension."""
@@ -66,22 +77,24 @@ def check_current_dimension():
 
 
 def alter_embedding_column(dry_run: bool = False):
-    """Alter the embedding column from 384 to 768 dimensions."""
+    """Alter the embedding column from vector(384) to halfvec(768)."""
     session = SessionLocal()
 
     try:
         logger.info("Step 1: Altering embedding column dimension from 384 to 768...")
 
         if dry_run:
-            logger.info("[DRY RUN] Would execute: ALTER TABLE document_embeddings ALTER COLUMN embedding TYPE vector(768)")
+            logger.info("[DRY RUN] Would execute: ALTER TABLE document_embeddings ALTER COLUMN embedding TYPE halfvec(768)")
             return True
 
-        # First, drop any existing index on the embedding column
+        # First, drop any existing index on the embedding column; it is rebuilt
+        # once after re-embedding instead of being maintained on every UPDATE
         try:
             session.execute(text("""
                 DROP INDEX IF EXISTS idx_document_embeddings_embedding;
+                DROP INDEX IF EXISTS idx_doc_embeddings_embedding_hnsw_cosine;
             """))
-            logger.info("Dropped existing embedding index (if any)")
+            logger.info("Dropped existing embedding indexes (if any)")
         except Exception as e:
             logger.warning(f"No index to drop or error: {e}")
 
@@ -94,18 +107,9 @@ def alter_embedding_column(dry_run: bool = False):
         # Alter the column type
         session.execute(text("""
             ALTER TABLE document_embeddings
-            ALTER COLUMN embedding TYPE vector(768);
+            ALTER COLUMN embedding TYPE halfvec(768);
         """))
-        logger.info("Altered embedding column to vector(768)")
-
-        # Recreate the index for faster similarity search
-        session.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_document_embeddings_embedding
-            ON document_embeddings
-            USING ivfflat (embedding vector_cosine_ops)
-            WITH (lists = 100);
-        """))
-        logger.info("Recreated embedding index with ivfflat")
+        logger.info("Altered embedding column to halfvec(768)")
 
         session.commit()
         logger.info("Column alteration completed successfully!")
@@ -119,90 +123,243 @@ def alter_embedding_column(dry_run: bool = False):
         session.close()
 
 
-def get_all_documents():
-    """Get all documents that need re-embedding."""
-    session = SessionLocal()
-    try:
-        documents = session.query(Document).all()
-        return [doc.to_dict() for doc in documents]
-    finally:
-        session.close()
+def iter_chunk_batches(session, batch_size: int = REEMBED_BATCH_SIZE):
+    """
+    Stream (id, content) rows for every chunk in fixed-size batches.
 
+    Uses a server-side cursor so the corpus is never fully loaded into memory.
+    """
+    stmt = (
+        select(DocumentEmbedding.id, DocumentEmbedding.content)
+        .order_by(DocumentEmbedding.document_id, DocumentEmbedding.chunk_index)
+        .execution_options(yield_per=1000)
+    )
+    batch = []
+    for row in session.execute(stmt):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Per-process model and encode settings, set once by the pool initializer
+_worker_model = None
+_worker_encode_kwargs = {}
+
+
+def _init_embedding_worker(model_name: str, num_threads: int, batch_size: int, normalize: bool):
+    """Load the SentenceTransformer once in each worker process."""
+    global _worker_model, _worker_encode_kwargs
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Split cores between workers instead of every worker using all of them
+    torch.set_num_threads(num_threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+    # Same settings as the embeddings service so vectors match query time
+    _worker_encode_kwargs = {"batch_size": batch_size, "normalize_embeddings": normalize}
+
+
+def _encode_shard(texts):
+    """Encode one batch of chunk texts in a worker process; returns a float32 array."""
+    return _worker_model.encode(
+        texts,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+        **_worker_encode_kwargs,
+    )  # ndarray: pickled back to the parent as raw bytes, not 768 Python floats
+
+
+def _create_encoder_pool(embeddings_service, workers: int):
+    """
+    Create a process pool for encoding, or None to encode in-process.
+
+    Only local HuggingFace models can be loaded in workers; API providers
+    are already remote and gain nothing from extra processes.
+    """
+    if workers <= 1:
+        return None
 
-def reembed_document(document_id: str, dry_run: bool = False):
-    """Re-embed a single document with the new model."""
-    session = SessionLocal()
+    if embeddings_service.provider != "huggingface":
+        logger.warning(
+            f"--workers ignored for provider '{embeddings_service.provider}', encoding in-process"
+        )
+        return None
 
-    try:
-        # Get the document
-        doc = session.query(Document).filter(Document.id == document_id).first()
-        if not doc:
-            logger.warning(f"Document {document_id} not found")
-            return False
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"Encoding with {workers} worker processes ({num_threads} threads each)")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        # spawn: don't fork the parent's DB connections and torch state
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_embedding_worker,
+        initargs=(
+            embeddings_service.model_name,
+            num_threads,
+            embeddings_service.encode_batch_size,
+            embeddings_service.normalize,
+        ),
+    )
 
-        # Get existing chunks
-        chunks = session.query(DocumentEmbedding).filter(
-            DocumentEmbedding.document_id == document_id
-        ).order_by(DocumentEmbedding.chunk_index).all()
 
-        if not chunks:
-            logger.warning(f"No chunks found for document {document_id}")
-            return False
+def _submit_batch(executor, embeddings_service, texts) -> Future:
+    """Encode a batch on the pool, or synchronously when there is no pool."""
+    if executor is not None:
+        return executor.submit(_encode_shard, texts)
 
-        logger.info(f"Re-embedding document: {doc.filename} ({len(chunks)} chunks)")
+    future = Future()
+    future.set_result(embeddings_service.embed_documents_array(texts))
+    return future
 
-        if dry_run:
-            logger.info(f"[DRY RUN] Would re-embed {len(chunks)} chunks")
-            return True
 
-        # Get embeddings service
-        embeddings_service = get_embeddings_service()
+def create_staging_table(raw_conn):
+    """Create the unlogged staging table the re-embed batches are copied into."""
+    with raw_conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        cursor.execute(f"CREATE UNLOGGED TABLE {STAGING_TABLE} (id uuid, embedding halfvec(768))")
+    raw_conn.commit()
 
-        # Re-embed each chunk
-        chunk_contents = [chunk.content for chunk in chunks]
-        new_embeddings = embeddings_service.embed_documents(chunk_contents)
 
-        # Update embeddings in database
-        for chunk, new_embedding in zip(chunks, new_embeddings):
-            chunk.embedding = new_embedding
+def copy_embeddings(raw_conn, chunk_ids, embeddings):
+    """COPY a batch of embeddings into the staging table in binary format."""
+    buffer = io.BytesIO(COPY_HEADER + copy_rows(chunk_ids, embeddings) + COPY_TRAILER)
 
-        session.commit()
-        logger.info(f"Successfully re-embedded document: {doc.filename}")
-        return True
+    with raw_conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY {STAGING_TABLE} FROM STDIN WITH (FORMAT BINARY)", buffer)
+    raw_conn.commit()
+
+
+def apply_staged_embeddings(raw_conn) -> int:
+    """Move the staged embeddings into document_embeddings with a single UPDATE."""
+    with raw_conn.cursor() as cursor:
+        cursor.execute(f"ANALYZE {STAGING_TABLE}")
+        cursor.execute(f"""
+            UPDATE document_embeddings AS d
+            SET embedding = t.embedding
+            FROM {STAGING_TABLE} AS t
+            WHERE d.id = t.id
+        """)
+        updated = cursor.rowcount
+    raw_conn.commit()
+    return updated
 
-    except Exception as e:
-        session.rollback()
-        logger.error(f"Error re-embedding document {document_id}: {e}")
-        return False
-    finally:
-        session.close()
 
+def drop_staging_table(raw_conn):
+    """Drop the staging table."""
+    with raw_conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+    raw_conn.commit()
 
-def reembed_all_documents(dry_run: bool = False):
-    """Re-embed all documents in the database."""
+
+def _use_all_cpu_threads():
+    """Let in-process CPU inference use every core; set once before encoding."""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(os.cpu_count() or 1)
+
+
+def reembed_all_documents(embeddings_service, dry_run: bool = False, workers: int = 1):
+    """
+    Re-embed every chunk in the database with the new model.
+
+    New embeddings are COPYed in binary into an unlogged staging table and
+    applied with one ``UPDATE ... FROM`` at the end, instead of a logged
+    UPDATE per batch. With ``workers > 1`` batches are encoded in parallel
+    worker processes; at most ``2 * workers`` batches are in flight, so
+    memory stays bounded.
+    """
     logger.info("Step 2: Re-embedding all documents with new model...")
 
-    documents = get_all_documents()
+    session = SessionLocal()
+    try:
+        total = session.execute(text("SELECT COUNT(*) FROM document_embeddings")).scalar()
+
+        if not total:
+            logger.info("No chunks found to re-embed")
+            return True
+
+        logger.info(f"Found {total} chunks to re-embed")
+
+        if dry_run:
+            logger.info(f"[DRY RUN] Would re-embed {total} chunks in batches of {REEMBED_BATCH_SIZE}")
+            return True
+
+        executor = _create_encoder_pool(embeddings_service, workers)
+        max_in_flight = 2 * workers if executor is not None else 0
+        pending = deque()
+        raw_conn = engine.raw_connection()
+        done = 0
+
+        def flush(limit: int):
+            nonlocal done
+            while len(pending) > limit:
+                chunk_ids, future = pending.popleft()
+                copy_embeddings(raw_conn, chunk_ids, future.result())
+                done += len(chunk_ids)
+                logger.info(f"Staged {done}/{total} chunks")
 
-    if not documents:
-        logger.info("No documents found to re-embed")
+        try:
+            create_staging_table(raw_conn)
+            for batch in iter_chunk_batches(session):
+                chunk_ids = [row.id for row in batch]
+                texts = [row.content for row in batch]
+                pending.append((chunk_ids, _submit_batch(executor, embeddings_service, texts)))
+                flush(max_in_flight)
+            flush(0)
+            updated = apply_staged_embeddings(raw_conn)
+        except Exception as e:
+            raw_conn.rollback()
+            logger.error(f"Error re-embedding chunks (stopped after {done}/{total}): {e}")
+            return False
+        finally:
+            try:
+                drop_staging_table(raw_conn)
+            finally:
+                raw_conn.close()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        logger.info(f"\nRe-embedding complete: {updated} chunks updated")
         return True
+    finally:
+        session.close()
 
-    logger.info(f"Found {len(documents)} documents to re-embed")
 
-    success_count = 0
-    error_count = 0
+def create_embedding_index(dry_run: bool = False):
+    """
+    Build the HNSW cosine index on the embedding column.
 
-    for i, doc in enumerate(documents, 1):
-        logger.info(f"Processing document {i}/{len(documents)}: {doc['filename']}")
+    Run after the embeddings are loaded: one bulk build is much cheaper than
+    inserting every updated row into the graph. Uses the same index name and
+    parameters as schema.sql so the two never create duplicate indexes.
+    """
+    logger.info("Step 3: Building HNSW embedding index...")
 
-        if reembed_document(doc['id'], dry_run):
-            success_count += 1
-        else:
-            error_count += 1
+    if dry_run:
+        logger.info("[DRY RUN] Would create HNSW index idx_doc_embeddings_embedding_hnsw_cosine")
+        return True
 
-    logger.info(f"\nRe-embedding complete: {success_count} successful, {error_count} errors")
-    return error_count == 0
+    session = SessionLocal()
+    try:
+        session.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_doc_embeddings_embedding_hnsw_cosine
+            ON document_embeddings
+            USING hnsw (embedding halfvec_cosine_ops)
+            WITH (m = 16, ef_construction = 64);
+        """))
+        session.commit()
+        logger.info("Created HNSW embedding index")
+        return True
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error creating embedding index: {e}")
+        return False
+    finally:
+        session.close()
 
 
 def main():
@@ -219,6 +376,12 @@ def main():
         action='store_true',
         help='Only alter column, skip re-embedding documents'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for encoding (default: 1, in-process)'
+    )
 
     args = parser.parse_args()
 
@@ -232,6 +395,14 @@ def main():
     if args.dry_run:
         print("\n*** DRY RUN MODE - No changes will be made ***\n")
 
+    # Load the model once up front (it is reused for every batch) so a load
+    # failure aborts before the column is altered
+    embeddings_service = None
+    if not args.skip_reembed and not args.dry_run:
+        embeddings_service = get_embeddings_service()
+        if args.workers <= 1:
+            _use_all_cpu_threads()
+
     # Step 1: Alter the column
     if not alter_embedding_column(args.dry_run):
         logger.error("Failed to alter embedding column. Aborting.")
@@ -239,13 +410,18 @@ def main():
 
     # Step 2: Re-embed documents
     if not args.skip_reembed:
-        if not reembed_all_documents(args.dry_run):
+        if not reembed_all_documents(embeddings_service, args.dry_run, workers=args.workers):
             logger.error("Some documents failed to re-embed.")
             sys.exit(1)
     else:
         logger.info("Skipping re-embedding (--skip-reembed flag set)")
         logger.warning("Remember to re-embed your documents manually!")
 
+    # Step 3: Index the loaded embeddings
+    if not create_embedding_index(args.dry_run):
+        logger.error("Failed to create embedding index.")
+        sys.exit(1)
+
     print("\n" + "=" * 60)
     print("Migration completed successfully!")
     print("=" * 60)
@@ -0,0 +1,44 @@
+"""
+PostgreSQL Binary COPY Encoding
+===============================
+Builds ``COPY ... FROM STDIN WITH (FORMAT BINARY)`` payloads for the
+embedding migration. Kept free of app imports so it can be used and
+tested without a configured environment.
+"""
+
+import struct
+
+import numpy as np
+
+# PostgreSQL binary COPY framing
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+
+
+def copy_rows(chunk_ids, embeddings) -> bytes:
+    """
+    Encode a batch as binary COPY tuples of (uuid, halfvec) in one NumPy pass.
+
+    Every tuple has the same layout (field count, uuid, then halfvec as dim,
+    unused, big-endian FP16 values), so the batch is a structured array whose
+    raw bytes are the COPY payload; no per-float Python conversion.
+    """
+    values = np.asarray(embeddings, dtype=">f2")
+    count, dim = values.shape
+    rows = np.empty(count, dtype=np.dtype([
+        ("fields", ">i2"),
+        ("id_len", ">i4"),
+        ("id", "V16"),
+        ("vec_len", ">i4"),
+        ("dim", ">i2"),
+        ("unused", ">i2"),
+        ("vec", ">f2", (dim,)),
+    ]))
+    rows["fields"] = 2
+    rows["id_len"] = 16
+    rows["id"] = np.frombuffer(b"".join(chunk_id.bytes for chunk_id in chunk_ids), dtype="V16")
+    rows["vec_len"] = 4 + 2 * dim
+    rows["dim"] = dim
+    rows["unused"] = 0
+    rows["vec"] = values
+    return rows.tobytes()
@@ -16,17 +16,21 @@ Usage:
 Options:
     --dry-run       Show what would be done without making changes
     --document-id   Re-index a specific document only
+    --force         Re-index documents even if their content hash is unchanged
 """
 
 import sys
 import os
 import argparse
+import hashlib
 import logging
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import text
+from typing import Iterator, Optional
+
+from sqlalchemy import func, select, text
 from langchain_core.documents import Document as LCDocument
 from app.database.connection import SessionLocal
 from app.database.models import Document, DocumentEmbedding
@@ -41,63 +45,116 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Documents re-indexed per outer transaction; each one runs in its own SAVEPOINT
+REINDEX_COMMIT_EVERY = 50
+
+
+def _document_filter(stmt, document_id: Optional[str]):
+    return stmt.where(Document.id == document_id) if document_id else stmt
+
+
+def count_documents(session, document_id: Optional[str] = None) -> int:
+    """Count documents to re-index."""
+    stmt = _document_filter(select(func.count()).select_from(Document), document_id)
+    return session.execute(stmt).scalar()
+
+
+def iter_documents(document_id: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yield documents one at a time with their content rebuilt from chunks.
+
+    One grouped query concatenates every document's chunks in Postgres and
+    streams the rows through a server-side cursor, so no chunk rows cross
+    the wire and only a few documents are held in memory at a time. The
+    cursor gets its own read-only session: the periodic commits of the
+    write session would otherwise close it.
+    """
+    sql = """
+        SELECT d.id, d.filename, d.user_id, d.document_hash,
+               COALESCE(string_agg(e.content, E'\\n\\n' ORDER BY e.chunk_index), '') AS content,
+               COUNT(e.id) AS chunk_count
+        FROM documents d
+        LEFT JOIN document_embeddings e ON e.document_id = d.id
+        {where}
+        GROUP BY d.id
+    """
+    where = "WHERE d.id = CAST(:document_id AS UUID)" if document_id else ""
 
-def get_all_documents():
-    """Get all documents from database with their content from chunks."""
     session = SessionLocal()
     try:
-        documents = session.query(Document).all()
-        result = []
-        for doc in documents:
-            # Get content from existing chunks
-            chunks = session.query(DocumentEmbedding).filter(
-                DocumentEmbedding.document_id == doc.id
-            ).order_by(DocumentEmbedding.chunk_index).all()
-
-            # Combine chunk content to get full document
-            full_content = "\n\n".join([chunk.content for chunk in chunks])
-
-            result.append({
-                'id': str(doc.id),
-                'filename': doc.filename,
-                'content': full_content,
-                'user_id': str(doc.user_id),
-                'chunk_count': len(chunks),
-            })
-        return result
+        result = session.execute(
+            text(sql.format(where=where)).execution_options(stream_results=True, yield_per=50),
+            {"document_id": document_id} if document_id else {},
+        )
+        for doc in result.mappings():
+            yield {
+                'id': str(doc['id']),
+                'filename': doc['filename'],
+                'content': doc['content'],
+                'user_id': str(doc['user_id']),
+                'chunk_count': doc['chunk_count'],
+                'document_hash': doc['document_hash'],
+            }
     finally:
         session.close()
 
 
-def delete_document_embeddings(document_id: str, dry_run: bool = False):
-    """Delete all embeddings for a document."""
-    session = SessionLocal()
-    try:
-        count = session.query(DocumentEmbedding).filter(
-            DocumentEmbedding.document_id == document_id
-        ).count()
+def content_hash(content: str) -> str:
+    """SHA-256 of the document content as rebuilt from its chunks."""
+    return hashlib.sha256(content.encode()).hexdigest()
 
-        if dry_run:
-            logger.info(f"[DRY RUN] Would delete {count} chunks for document {document_id}")
-            return count
 
-        session.query(DocumentEmbedding).filter(
-            DocumentEmbedding.document_id == document_id
-        ).delete()
-        session.commit()
+def is_unchanged(document: dict) -> bool:
+    """True if the document's chunks match the hash stored at its last re-index."""
+    return (
+        document['chunk_count'] > 0
+        and document['document_hash'] == content_hash(document['content'])
+    )
+
+
+def delete_document_embeddings(session, document_id: str, dry_run: bool = False):
+    """Delete all embeddings for a document in the session's current transaction."""
+    query = session.query(DocumentEmbedding).filter(
+        DocumentEmbedding.document_id == document_id
+    )
 
-        logger.info(f"Deleted {count} old chunks for document {document_id}")
+    if dry_run:
+        count = query.count()
+        logger.info(f"[DRY RUN] Would delete {count} chunks for document {document_id}")
         return count
-    except Exception as e:
-        session.rollback()
-        logger.error(f"Error deleting embeddings: {e}")
-        return 0
-    finally:
-        session.close()
 
+    count = query.delete(synchronize_session=False)
+    logger.info(f"Deleted {count} old chunks for document {document_id}")
+    return count
+
+
+def _use_all_cpu_threads():
+    """Let in-process CPU inference use every core; set once before encoding."""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(os.cpu_count() or 1)
 
-def reindex_document(document: dict, dry_run: bool = False):
-    """Re-index a single document with new chunk settings."""
+
+def create_splitter():
+    """Build the splitter used for every document in the run."""
+    return TextSplitterService(
+        config=ChunkConfig(
+            chunk_size=300,  # Smaller chunks for precise matching
+            chunk_overlap=30,
+            strategy=ChunkingStrategy.SENTENCE,
+        )
+    )
+
+
+def reindex_document(session, document: dict, splitter, vector_store, dry_run: bool = False):
+    """
+    Re-index a single document with new chunk settings.
+
+    The delete and the new embeddings run inside a SAVEPOINT on ``session``,
+    so a failure rolls back only this document; the caller commits.
+    """
     doc_id = document['id']
     filename = document['filename']
     content = document['content']
@@ -113,18 +170,7 @@ def reindex_document(document: dict, dry_run: bool = False):
         logger.warning(f"Document {filename} has no content, skipping")
         return False
 
-    # Step 1: Delete old embeddings
-    old_count = delete_document_embeddings(doc_id, dry_run)
-
-    # Step 2: Split document with new settings
-    splitter = TextSplitterService(
-        config=ChunkConfig(
-            chunk_size=300,  # Smaller chunks for precise matching
-            chunk_overlap=30,
-            strategy=ChunkingStrategy.SENTENCE,
-        )
-    )
-
+    # Step 1: Split document with new settings
     # Create a LangChain document
     lc_doc = LCDocument(
         page_content=content,
@@ -133,7 +179,7 @@ def reindex_document(document: dict, dry_run: bool = False):
 
     chunks = splitter.split_documents([lc_doc])
 
-    logger.info(f"Split into {len(chunks)} chunks (was {old_count})")
+    logger.info(f"Split into {len(chunks)} chunks (was {old_chunk_count})")
 
     # Show sample chunks
     for i, chunk in enumerate(chunks[:3]):
@@ -141,21 +187,30 @@ def reindex_document(document: dict, dry_run: bool = False):
         logger.info(f"  Chunk {i}: {preview}...")
 
     if dry_run:
+        delete_document_embeddings(session, doc_id, dry_run)
         logger.info(f"[DRY RUN] Would create {len(chunks)} new embeddings")
         return True
 
-    # Step 3: Generate embeddings and store
-    vector_store = get_vector_store()
-
+    # Step 2: Replace old embeddings with new ones in one SAVEPOINT
     try:
-        added = vector_store.add_documents(
-            documents=chunks,
-            document_id=doc_id,
-        )
+        with session.begin_nested():
+            delete_document_embeddings(session, doc_id)
+            added = vector_store.add_documents(
+                documents=chunks,
+                document_id=doc_id,
+                session=session,
+            )
+            # Hash the content as the next run will rebuild it from these chunks,
+            # so an untouched document is skipped next time
+            new_hash = content_hash("\n\n".join(chunk.page_content for chunk in chunks))
+            session.execute(
+                text("UPDATE documents SET document_hash = :h, embedding_count = :n WHERE id = :id"),
+                {"h": new_hash, "n": added, "id": doc_id},
+            )
         logger.info(f"Created {added} new embeddings for {filename}")
         return True
     except Exception as e:
-        logger.error(f"Error creating embeddings: {e}")
+        logger.error(f"Error re-indexing {filename}: {e}")
         return False
 
 
@@ -210,6 +265,11 @@ def main():
         type=str,
         help='Re-index only a specific document'
     )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-index documents even if their content hash is unchanged'
+    )
 
     args = parser.parse_args()
 
@@ -226,32 +286,57 @@ def main():
     if args.dry_run:
         print("\n*** DRY RUN MODE - No changes will be made ***\n")
 
-    # Get documents
-    documents = get_all_documents()
+    # One write session for the whole run; documents are streamed one at a time below
+    session = SessionLocal()
+
+    # Count documents
+    total = count_documents(session, args.document_id)
 
-    if args.document_id:
-        documents = [d for d in documents if d['id'] == args.document_id]
-        if not documents:
-            logger.error(f"Document {args.document_id} not found")
-            sys.exit(1)
+    if args.document_id and not total:
+        session.close()
+        logger.error(f"Document {args.document_id} not found")
+        sys.exit(1)
 
-    if not documents:
+    if not total:
+        session.close()
         logger.info("No documents found to re-index")
         sys.exit(0)
 
-    logger.info(f"Found {len(documents)} documents to re-index")
+    logger.info(f"Found {total} documents to re-index")
+
+    # Build the splitter and load the embedding model once; every document reuses them
+    splitter = create_splitter()
+    vector_store = None
+    if not args.dry_run:
+        get_embeddings_service()
+        _use_all_cpu_threads()
+        vector_store = get_vector_store()
 
     # Process each document
     success_count = 0
+    skipped_count = 0
     error_count = 0
 
-    for i, doc in enumerate(documents, 1):
-        logger.info(f"\nProgress: {i}/{len(documents)}")
+    try:
+        for i, doc in enumerate(iter_documents(args.document_id), 1):
+            logger.info(f"\nProgress: {i}/{total}")
+
+            if not args.force and is_unchanged(doc):
+                logger.info(f"{doc['filename']} unchanged since last re-index, skipping")
+                skipped_count += 1
+                continue
+
+            if reindex_document(session, doc, splitter, vector_store, args.dry_run):
+                success_count += 1
+            else:
+                error_count += 1
+
+            if i % REINDEX_COMMIT_EVERY == 0:
+                session.commit()
 
-        if reindex_document(doc, args.dry_run):
-            success_count += 1
-        else:
-            error_count += 1
+        session.commit()
+    finally:
+        session.close()
 
     # Verify
     if not args.dry_run:
@@ -261,6 +346,7 @@ def main():
     print("\n" + "=" * 60)
     print(f"Re-indexing complete!")
     print(f"  Success: {success_count}")
+    print(f"  Unchanged: {skipped_count}")
     print(f"  Errors: {error_count}")
     print("=" * 60)
 
@@ -0,0 +1,53 @@
+"""Tests for the schema.sql statement splitter."""
+
+from scripts.apply_full_schema import split_sql_statements
+
+
+def test_dollar_quoted_function_body_is_one_statement():
+    script = """
+    CREATE OR REPLACE FUNCTION touch() RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.updated_at = NOW();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+    SELECT 1;
+    """
+
+    statements = split_sql_statements(script)
+
+    assert len(statements) == 2
+    assert statements[0].startswith("CREATE OR REPLACE FUNCTION touch()")
+    assert "RETURN NEW;" in statements[0]
+    assert statements[0].endswith("$$ LANGUAGE plpgsql")
+    assert statements[1] == "SELECT 1"
+
+
+def test_tagged_dollar_quote_ignores_inner_plain_dollars():
+    script = "DO $body$ BEGIN PERFORM '$$;'; END $body$; SELECT 2;"
+
+    assert split_sql_statements(script) == [
+        "DO $body$ BEGIN PERFORM '$$;'; END $body$",
+        "SELECT 2",
+    ]
+
+
+def test_comments_containing_semicolons_are_dropped():
+    script = """
+    -- drop old rows; then rebuild
+    CREATE TABLE a (id INT); -- trailing; comment
+    /* block; comment */ CREATE TABLE b (id INT);
+    """
+
+    statements = split_sql_statements(script)
+
+    assert statements == ["CREATE TABLE a (id INT)", "CREATE TABLE b (id INT)"]
+
+
+def test_semicolons_in_string_literals_do_not_split():
+    script = "INSERT INTO t VALUES ('a;b', 'it''s;'); SELECT 3"
+
+    assert split_sql_statements(script) == [
+        "INSERT INTO t VALUES ('a;b', 'it''s;')",
+        "SELECT 3",
+    ]
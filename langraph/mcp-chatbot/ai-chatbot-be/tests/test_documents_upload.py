@@ -0,0 +1,84 @@
+"""Tests for the document upload route's storage paths."""
+
+import asyncio
+import io
+from types import SimpleNamespace
+
+import httpx
+from starlette.datastructures import Headers, UploadFile
+
+from app.api.routes import documents
+from app.repositories.supabase_document import (
+    RESUMABLE_CHUNK_SIZE,
+    RESUMABLE_THRESHOLD,
+    SupabaseDocumentRepository,
+)
+
+UPLOAD_URL = "https://test-project.supabase.co/storage/v1/upload/resumable/upload-1"
+
+
+class _FakeTable:
+    def insert(self, data):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[{"id": "doc-1"}])
+
+
+class _FakeProcessor:
+    def __init__(self):
+        self.processed = []
+
+    async def process_document(self, document_id, file_content, content_type):
+        self.processed.append(document_id)
+
+
+def _tus_server(requests):
+    """Mock transport for Supabase's TUS endpoint that records every request."""
+    received = bytearray()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.method == "POST":
+            assert request.url.path == "/storage/v1/upload/resumable"
+            return httpx.Response(201, headers={"Location": UPLOAD_URL})
+        assert request.method == "PATCH"
+        assert str(request.url) == UPLOAD_URL
+        assert int(request.headers["Upload-Offset"]) == len(received)
+        received.extend(request.content)
+        return httpx.Response(204, headers={"Upload-Offset": str(len(received))})
+
+    return httpx.MockTransport(handler), received
+
+
+def test_large_upload_goes_through_resumable_path(monkeypatch):
+    content = b"%PDF" + b"x" * RESUMABLE_THRESHOLD
+    requests = []
+    transport, received = _tus_server(requests)
+
+    repository = SupabaseDocumentRepository()
+    repository._http = httpx.AsyncClient(
+        base_url="https://test-project.supabase.co/storage/v1", transport=transport
+    )
+    processor = _FakeProcessor()
+    monkeypatch.setattr(documents, "supabase_client", SimpleNamespace(table=lambda name: _FakeTable()))
+    monkeypatch.setattr(documents, "get_document_processor", lambda: processor)
+
+    upload = UploadFile(
+        file=io.BytesIO(content),
+        size=len(content),
+        filename="large.pdf",
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+
+    result = asyncio.run(documents.upload_document(
+        file=upload, user_id="user-1", storage_client=repository
+    ))
+
+    assert [r.method for r in requests] == ["POST", "PATCH", "PATCH"]
+    assert requests[0].headers["Upload-Length"] == str(len(content))
+    assert [int(r.headers["Upload-Offset"]) for r in requests[1:]] == [0, RESUMABLE_CHUNK_SIZE]
+    assert bytes(received) == content
+    assert result["document_id"] == "doc-1"
+    assert "/user-1/" in result["storage_url"]
+    assert processor.processed == ["doc-1"]
@@ -0,0 +1,32 @@
+"""Tests for the binary COPY payload built by the embedding migration."""
+
+import uuid
+
+import numpy as np
+
+from scripts.pg_binary_copy import copy_rows
+
+
+def test_copy_rows_encodes_uuid_halfvec_tuples():
+    chunk_ids = [uuid.UUID(int=1), uuid.UUID(int=2)]
+    embeddings = np.array([[1.0, -2.0], [0.5, 0.0]], dtype=np.float32)
+
+    halfvecs = [b"\x3c\x00\xc0\x00", b"\x38\x00\x00\x00"]  # big-endian FP16
+    expected = b"".join(
+        b"\x00\x02"  # field count
+        + b"\x00\x00\x00\x10" + chunk_id.bytes  # uuid length and bytes
+        + b"\x00\x00\x00\x08"  # halfvec length: 4-byte header + 2 * 2
+        + b"\x00\x02\x00\x00"  # dim, unused
+        + values
+        for chunk_id, values in zip(chunk_ids, halfvecs)
+    )
+
+    assert copy_rows(chunk_ids, embeddings) == expected
+
+
+def test_copy_rows_accepts_list_embeddings():
+    chunk_ids = [uuid.UUID(int=3)]
+
+    assert copy_rows(chunk_ids, [[1.0, -2.0]]) == copy_rows(
+        chunk_ids, np.array([[1.0, -2.0]], dtype=np.float32)
+    )